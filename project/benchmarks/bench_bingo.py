@@ -0,0 +1,114 @@
+"""
+This file houses the benchmark for bingo line detection. It compares the
+list-based detection previously used by customer_board.check_bingo (called
+once per completed goal by set_board_progress) and by the Validator's row,
+column and diagonal checks, against the bitmask engine in modules/bingo.py.
+
+Run with: python benchmarks/bench_bingo.py
+"""
+
+import os
+import sys
+import random
+import timeit
+
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../src'))  # Import the src folder
+from modules import bingo
+
+
+def list_lines(completed_indices, size):
+    """
+    Return the completed lines the way check_bingo used to: rebuild every
+    line as a list and test each cell's membership in the completed list.
+    """
+    ranges = [[(size - 1) * i for i in range(1, size + 1)]]
+    for i in range(0, size * size, size):
+        ranges.append(list(range(i, i + size)))
+    for i in range(size):
+        ranges.append([x for x in range(size * size) if x % size == i])
+    ranges.append([(size + 1) * i for i in range(size)])
+    return [
+        count for count, rang in enumerate(ranges)
+        if all(i in completed_indices for i in rang)
+    ]
+
+
+def list_progress(completed_indices, size):
+    """
+    Mark a customer's board the way set_board_progress used to, running the
+    whole line detection once per completed goal.
+    """
+    return [list_lines(completed_indices, size) for _ in completed_indices]
+
+
+def mask_progress(completed_indices, size):
+    """
+    Mark a customer's board using the bitmask engine, once per board.
+    """
+    return bingo.get_completed_lines(bingo.get_cells_mask(completed_indices),
+                                     size)
+
+
+def list_scan(position, completed_indices, size):
+    """
+    Find lines through a newly completed cell the way the Validator used to,
+    counting completed goals cell by cell for its row, column and diagonals.
+    """
+    goals = [{"position": str(i)} for i in completed_indices]
+    found = []
+    lines = [
+        list(range(position - position % size,
+                   position - position % size + size)),
+        list(range(position % size, size * size, size)),
+        list(range(0, size * size, size + 1)),
+        list(range(size - 1, size * size - (size - 1), size - 1))
+    ]
+    for line in lines:
+        counter = 0
+        for i in line:
+            for goal in goals:
+                if i == int(goal["position"]):
+                    counter += 1
+        if counter == size:
+            found.append(line)
+    return found
+
+
+def mask_scan(position, completed_indices, size):
+    """
+    Find lines through a newly completed cell using the bitmask engine.
+    """
+    goals = [{"position": str(i)} for i in completed_indices]
+    mask = bingo.get_cells_mask(goal["position"] for goal in goals)
+    return bingo.get_new_lines(mask, position, size)
+
+
+def run(sizes=range(3, 11), fill=0.7, repeat=50):
+    """
+    Time both approaches on boards of each size with the given fraction of
+    cells completed, and print the mean time per call in microseconds.
+    """
+    random.seed(0)
+    print("%4s %14s %14s %14s %14s" % ("size", "board list", "board mask",
+                                       "scan list", "scan mask"))
+    for size in sizes:
+        cells = list(range(size * size))
+        completed = random.sample(cells, int(len(cells) * fill))
+        position = completed[-1]
+        timings = [
+            timeit.timeit(lambda: list_progress(completed, size),
+                          number=repeat),
+            timeit.timeit(lambda: mask_progress(completed, size),
+                          number=repeat),
+            timeit.timeit(lambda: list_scan(position, completed, size),
+                          number=repeat),
+            timeit.timeit(lambda: mask_scan(position, completed, size),
+                          number=repeat),
+        ]
+        print("%4d %14.1f %14.1f %14.1f %14.1f" %
+              tuple([size] + [t / repeat * 1e6 for t in timings]))
+
+
+if __name__ == "__main__":
+    run()
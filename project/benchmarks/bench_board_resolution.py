@@ -0,0 +1,64 @@
+"""
+This file houses the benchmark for resolving a bingo board's goal and reward
+ids into catalog entries. It compares the previous nested lookup, which deep
+copied every match, against the _id-indexed resolution used by
+GameBoardManager.get_bingo_board, with and without reusing the index.
+
+Run with: python benchmarks/bench_board_resolution.py
+"""
+
+import os
+import sys
+import copy
+import timeit
+from bson.objectid import ObjectId
+
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../src'))  # Import the src folder
+from modules.owner.game_board import index_by_id, resolve_board_items
+
+
+def nested_resolution(ids, items):
+    """
+    Resolve ids the way get_bingo_board used to: a scan of the whole catalog
+    for every cell, deep copying each match.
+    """
+    return [
+        copy.deepcopy(item) for index in ids for item in items
+        if index == item["_id"]
+    ]
+
+
+def run(catalog_sizes=(100, 1000, 5000), board_size=5, repeat=20):
+    """
+    Time the resolutions of a full board against catalogs of each size and
+    print the mean time per board in milliseconds. "indexed" builds the _id
+    index on every call, while "reused" resolves against an index that was
+    built once.
+    """
+    print("%8s %12s %12s %12s" % ("catalog", "nested (ms)", "indexed (ms)",
+                                   "reused (ms)"))
+    for catalog_size in catalog_sizes:
+        goals = [{
+            "_id": ObjectId(),
+            "goal": "Goal " + str(i)
+        } for i in range(catalog_size)]
+        # Spread the board's cells over the catalog, ending at its last entry
+        ids = [
+            goals[-1 - i * (catalog_size // (board_size * board_size))]["_id"]
+            for i in range(board_size * board_size)
+        ]
+        nested = timeit.timeit(lambda: nested_resolution(ids, goals),
+                               number=repeat) / repeat
+        built = timeit.timeit(
+            lambda: resolve_board_items(ids, index_by_id(goals)),
+            number=repeat) / repeat
+        catalog = index_by_id(goals)
+        prebuilt = timeit.timeit(lambda: resolve_board_items(ids, catalog),
+                                 number=repeat) / repeat
+        print("%8d %12.3f %12.3f %12.3f" % (catalog_size, nested * 1000,
+                                             built * 1000, prebuilt * 1000))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,311 @@
+"""
+This file houses the benchmark of the apps' core flows. It seeds a synthetic
+dataset (see dataset.py) into mongomock, a local stand-in for the remote
+database, then times each flow over many customers and restaurants and counts
+its database round trips. Results are compared against the baselines stored in
+baselines.json, when taken on a dataset of the same size, so that regressions
+show up as numbers. With --latency, every
+round trip is delayed as it would be against the remote database, showing
+which flows are chatty.
+
+Run with: python benchmarks/bench_flows.py [--save] [--tolerance 1.5]
+                                           [--latency 20 --jitter 5]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+import mongomock
+from flask import Flask
+
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../src'))  # Import the src folder
+from modules.database import Database
+from modules.indexes import IndexManager
+from modules.latency import LatencyBackend
+from modules.owner.restaurant_profile_manager import RestaurantProfileManager
+from modules.owner.game_board import GameBoardManager
+from modules.owner.public_profile import PublicProfileModifier
+from modules.owner.verification import Validator
+from modules.customer.customer_profile_manager import CustomerProfileManager
+from modules.customer.customer_board import set_board_progress, get_reward_progress
+from dataset import seed
+
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+
+def get_bingo_board_calls(data, rounds):
+    """
+    Return calls loading the board of random owners.
+    """
+    owners = random.sample(data["owners"], rounds)
+    return [
+        lambda owner=owner: GameBoardManager(
+            RestaurantProfileManager(owner["username"])).get_bingo_board()
+        for owner in owners
+    ]
+
+
+def set_board_progress_calls(app, data, rounds):
+    """
+    Return calls marking a customer's progress on a board that has already
+    been loaded.
+    """
+    calls = []
+    for progress in random.sample(data["progress"], rounds):
+        with app.app_context():
+            board = GameBoardManager(RestaurantProfileManager(
+                "")).get_restaurant_board_by_id(progress["restaurant_id"])
+        calls.append(lambda progress=progress, board=board: set_board_progress(
+            CustomerProfileManager(progress["customer"]), board, progress[
+                "restaurant_id"]))
+    return calls
+
+
+def complete_goal_calls(data, rounds):
+    """
+    Return calls completing a goal a customer has not completed yet.
+    """
+    owners = {owner["_id"]: owner for owner in data["owners"]}
+    calls = []
+    for progress in random.sample(data["progress"], rounds):
+        owner = owners[progress["restaurant_id"]]
+        board = owner["bingo_board"]["board"]
+        done = {goal["position"] for goal in progress["completed_goals"]}
+        position = next(
+            str(i) for i in range(len(board)) if str(i) not in done)
+        calls.append(lambda owner=owner, progress=progress, position=position:
+                     Validator(RestaurantProfileManager(owner["username"])).
+                     complete_goal(progress["customer"],
+                                   str(owner["bingo_board"]["board"][int(
+                                       position)]), position))
+    return calls
+
+
+def complete_reward_calls(data, rounds):
+    """
+    Return calls redeeming a reward that has not been redeemed yet.
+    """
+    owners = {owner["_id"]: owner for owner in data["owners"]}
+    redemptions = [
+        redemption for redemption in data["redemptions"]
+        if not redemption["is_redeemed"]
+    ]
+    return [
+        lambda redemption=redemption: Validator(
+            RestaurantProfileManager(owners[redemption["restaurant_id"]][
+                "username"])).complete_reward(redemption["customer"],
+                                              redemption["redemption_code"])
+        for redemption in random.sample(redemptions, rounds)
+    ]
+
+
+def get_public_profiles_calls(rounds):
+    """
+    Return calls listing every public restaurant.
+    """
+    return [
+        lambda: PublicProfileModifier(RestaurantProfileManager(
+            "")).get_public_profiles() for _ in range(rounds)
+    ]
+
+
+def get_directory_page_calls(rounds):
+    """
+    Return calls reading the first page of the restaurant directory.
+    """
+    return [
+        lambda: PublicProfileModifier(RestaurantProfileManager(
+            "")).get_directory_page() for _ in range(rounds)
+    ]
+
+
+def get_reward_progress_calls(data, rounds):
+    """
+    Return calls reading the reward history of random customers.
+    """
+    return [
+        lambda customer=customer: get_reward_progress(
+            CustomerProfileManager(customer["username"]))
+        for customer in random.sample(data["customers"], rounds)
+    ]
+
+
+def update_board_calls(db, data, rounds):
+    """
+    Expire the boards of random owners and return calls rotating them.
+    """
+    owners = random.sample(data["owners"], rounds)
+    db["restaurant_users"].update_many(
+        {"_id": {
+            "$in": [owner["_id"] for owner in owners]
+        }}, {"$set": {
+            "bingo_board.expiry_date": datetime.now() - timedelta(days=1)
+        }})
+    return [
+        lambda owner=owner: GameBoardManager(RestaurantProfileManager(
+            "")).update_board(owner["_id"]) for owner in owners
+    ]
+
+
+def time_calls(app, calls):
+    """
+    Run each call in its own app context, as it would be in its own request,
+    and return the time each took in milliseconds.
+    """
+    times = []
+    for call in calls:
+        with app.app_context():
+            start = time.perf_counter()
+            call()
+            times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def summarize(times, round_trips):
+    """
+    Return the median, mean and 95th percentile of the given times, along
+    with the mean number of round trips per call.
+    """
+    times = sorted(times)
+    return {
+        "median_ms": round(times[len(times) // 2], 3),
+        "mean_ms": round(sum(times) / len(times), 3),
+        "p95_ms": round(times[int(len(times) * 0.95)], 3),
+        "round_trips": round(round_trips / len(times), 2)
+    }
+
+
+def run(restaurants=200,
+        customers=1000,
+        rounds=100,
+        latency_ms=0,
+        jitter_ms=0):
+    """
+    Seed the dataset into a fresh mongomock database, time every flow and
+    return their summaries keyed by flow name. The flows' round trips are
+    delayed by latency_ms milliseconds, plus or minus up to jitter_ms.
+    """
+    db = mongomock.MongoClient().bytes
+    backend = LatencyBackend(db, latency_ms, jitter_ms, random_seed=0)
+    app = Flask(__name__)
+    Database.configure(backend)
+    with app.app_context():
+        IndexManager().ensure_indexes()
+    data = seed(db, restaurants=restaurants, customers=customers)
+    random.seed(1)
+
+    flows = [
+        ("get_bingo_board", lambda: get_bingo_board_calls(data, rounds)),
+        ("set_board_progress",
+         lambda: set_board_progress_calls(app, data, rounds)),
+        ("complete_goal", lambda: complete_goal_calls(data, rounds)),
+        ("complete_reward", lambda: complete_reward_calls(data, rounds)),
+        ("get_public_profiles", lambda: get_public_profiles_calls(rounds)),
+        ("get_directory_page", lambda: get_directory_page_calls(rounds)),
+        ("get_reward_progress", lambda: get_reward_progress_calls(data, rounds)),
+        ("update_board", lambda: update_board_calls(db, data, rounds)),
+    ]
+    results = {}
+    for name, make_calls in flows:
+        calls = make_calls()
+        backend.reset()
+        results[name] = summarize(time_calls(app, calls), backend.get_count())
+    return results
+
+
+def compare(results, baselines, tolerance):
+    """
+    Print each flow's results next to its baseline and return the names of
+    the flows whose median is more than tolerance times their baseline's.
+    """
+    regressions = []
+    print("%-20s %11s %11s %11s %9s %12s" % ("flow", "median (ms)", "p95 (ms)",
+                                              "base (ms)", "ratio",
+                                              "round trips"))
+    for name, result in results.items():
+        base = baselines.get(name, {}).get("median_ms")
+        ratio = result["median_ms"] / base if base else None
+        flag = ""
+        if ratio is not None and ratio > tolerance:
+            regressions.append(name)
+            flag = " REGRESSION"
+        print("%-20s %11.3f %11.3f %11s %9s %12.2f%s" %
+              (name, result["median_ms"], result["p95_ms"],
+               "%.3f" % base if base else "-", "%.2f" %
+               ratio if ratio is not None else "-", result["round_trips"],
+               flag))
+    return regressions
+
+
+def main():
+    """
+    Run the benchmark from the command line. Exits with status 1 if any flow
+    regressed past the tolerance.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--restaurants", type=int, default=200)
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--tolerance",
+                        type=float,
+                        default=1.5,
+                        help="Largest allowed median / baseline ratio.")
+    parser.add_argument("--latency",
+                        type=float,
+                        default=0,
+                        help="Milliseconds added to every round trip.")
+    parser.add_argument("--jitter",
+                        type=float,
+                        default=0,
+                        help="Largest random change to each latency, in ms.")
+    parser.add_argument("--save",
+                        action="store_true",
+                        help="Store the results as the new baselines.")
+    args = parser.parse_args()
+    if args.save and (args.latency or args.jitter):
+        parser.error("baselines are taken without --latency or --jitter")
+
+    results = run(args.restaurants, args.customers, args.rounds, args.latency,
+                  args.jitter)
+    baselines = {}
+    # Baselines are taken without latency, so they are only compared without
+    if os.path.exists(BASELINES) and not args.latency and not args.jitter:
+        with open(BASELINES) as baselines_file:
+            saved = json.load(baselines_file)
+        dataset = saved.get("dataset", {})
+        # Flows get slower as the dataset grows, so only compare like for like
+        if (dataset.get("restaurants"), dataset.get("customers")) == \
+                (args.restaurants, args.customers):
+            baselines = saved["flows"]
+        else:
+            print("Baselines were taken with %s restaurants and %s customers,"
+                  " not compared." % (dataset.get("restaurants"),
+                                      dataset.get("customers")))
+    regressions = compare(results, baselines, args.tolerance)
+    if args.save:
+        with open(BASELINES, "w") as baselines_file:
+            json.dump(
+                {
+                    "dataset": {
+                        "restaurants": args.restaurants,
+                        "customers": args.customers,
+                        "rounds": args.rounds,
+                        "latency_ms": args.latency,
+                        "jitter_ms": args.jitter
+                    },
+                    "flows": results
+                },
+                baselines_file,
+                indent=4)
+        print("Saved baselines to " + BASELINES)
+    elif regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+This file houses the micro-benchmark of converting id strings in queries to
+ObjectIds. It compares Database.convert_ids, which only converts the fields
+declared in ID_FIELDS, against the recursive walker it replaced, which
+rebuilt every query and checked every string.
+
+Run with: python benchmarks/bench_object_ids.py [--number 100000]
+"""
+
+import os
+import sys
+import timeit
+import argparse
+from bson.objectid import ObjectId
+
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../src'))  # Import the src folder
+from modules.database import Database
+
+# Queries as the apps make them, by collection
+QUERIES = [
+    ("restaurant_users", {
+        "username": "owner0"
+    }),
+    ("restaurant_users", {
+        "_id": "5ef5009bccd1e88ead4cd076"
+    }),
+    ("restaurant_users", {
+        "_id": {
+            "$in": [ObjectId() for _ in range(24)]
+        },
+        "profile.is_public": True
+    }),
+    ("progress", {
+        "customer": "customer0",
+        "restaurant_id": "5ef5009bccd1e88ead4cd076",
+        "epoch": 0,
+        "completed_goals": {
+            "$not": {
+                "$elemMatch": {
+                    "_id": ObjectId(),
+                    "position": "3"
+                }
+            }
+        }
+    }),
+    ("redemptions", {
+        "redemption_code": "customer0+5ef5009bccd1e88ead4cd076+0+2020-07-28",
+        "restaurant_id": ObjectId(),
+        "customer": "customer0",
+        "is_redeemed": False
+    }),
+]
+
+
+def replace_object_id(document):
+    """
+    Return the given document with every valid id string converted to an
+    ObjectId, wherever it is. This is the walker convert_ids replaced.
+    """
+    if isinstance(document, dict):
+        return {key: replace_object_id(val) for key, val in document.items()}
+    if isinstance(document, list):
+        return [replace_object_id(val) for val in document]
+    if isinstance(document, str) and ObjectId.is_valid(document):
+        return ObjectId(document)
+    return document
+
+
+def main():
+    """
+    Time both conversions of every query and print them side by side.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args()
+
+    print("%-20s %-30s %10s %10s %7s" %
+          ("collection", "query", "walker (us)", "schema (us)", "speedup"))
+    for collection, query in QUERIES:
+        assert Database.convert_ids(collection,
+                                    query) == replace_object_id(query)
+        walker = timeit.timeit(lambda: replace_object_id(query),
+                               number=args.number) / args.number * 1e6
+        schema = timeit.timeit(
+            lambda: Database.convert_ids(collection, query),
+            number=args.number) / args.number * 1e6
+        print("%-20s %-30s %10.3f %10.3f %6.1fx" %
+              (collection, ", ".join(query)[:30], walker, schema,
+               walker / schema))
+
+
+if __name__ == "__main__":
+    main()
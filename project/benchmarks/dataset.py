@@ -0,0 +1,148 @@
+"""
+This file houses the synthetic dataset used by the flow benchmarks. It seeds a
+database (i.e a mongomock database) with shared goals and rewards, restaurant
+owners with public profiles and boards, and customers with progress and
+rewards at several restaurants each.
+"""
+
+import random
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from werkzeug.security import generate_password_hash
+
+CATEGORIES = ["Pizza", "Sushi", "Burgers", "Cafe", "Thai", "Indian"]
+CITIES = ["Toronto", "Ottawa", "Montreal", "Vancouver"]
+
+
+def make_board(goals, rewards, size, expiry_date):
+    """
+    Return a bingo board of the given size drawn from the given goals and
+    rewards, as stored on an owner.
+    """
+    return {
+        "name": "Board",
+        "size": size,
+        "expiry_date": expiry_date,
+        "board": [goal["_id"] for goal in random.sample(goals, size * size)],
+        "board_reward": [
+            reward["_id"] for reward in random.sample(rewards, 2 * size + 2)
+        ]
+    }
+
+
+def seed(db,
+         restaurants=200,
+         customers=1000,
+         visits=5,
+         board_size=5,
+         catalog_size=200,
+         random_seed=0):
+    """
+    Seed the given database with a synthetic dataset. Each customer has made
+    progress at visits restaurants, having completed a random part of each
+    board and been issued a reward for some of them. Return a dictionary of
+    the seeded "owners", "customers", "progress", "redemptions", "goals" and
+    "rewards" documents.
+    """
+    random.seed(random_seed)
+    now = datetime.now()
+    password = generate_password_hash("password", method='sha256')
+    goals = [{
+        "_id": ObjectId(),
+        "goal": "Shared goal " + str(i)
+    } for i in range(catalog_size)]
+    rewards = [{
+        "_id": ObjectId(),
+        "reward": "Shared reward " + str(i)
+    } for i in range(catalog_size)]
+    db["goals"].insert_many(goals)
+    db["rewards"].insert_many(rewards)
+
+    owners = []
+    for i in range(restaurants):
+        custom_goals = [{
+            "_id": ObjectId(),
+            "goal": "Custom goal " + str(j)
+        } for j in range(5)]
+        board = make_board(goals + custom_goals, rewards, board_size,
+                           now + timedelta(days=30))
+        owners.append({
+            "_id": ObjectId(),
+            "username": "owner" + str(i),
+            "fullname": "Owner " + str(i),
+            "hashed_password": password,
+            "goals": custom_goals,
+            "rewards": [],
+            "bingo_board": board,
+            "future_board": make_board(goals, rewards, board_size,
+                                       now + timedelta(days=120)),
+            "profile": {
+                "name": "Restaurant " + str(i),
+                "category": CATEGORIES[i % len(CATEGORIES)],
+                "image": "https://images.com/restaurant.jpg",
+                "description": "Simple food. Amazing taste.",
+                "phone_number": "416-555-5555",
+                "location": {
+                    "address": str(i) + " Bremner Blvd",
+                    "postal_code": "M5V3L9",
+                    "city": CITIES[i % len(CITIES)],
+                    "province": "ON"
+                },
+                "is_public": i % 10 != 0
+            }
+        })
+    db["restaurant_users"].insert_many(owners)
+
+    people = []
+    progress = []
+    redemptions = []
+    for i in range(customers):
+        username = "customer" + str(i)
+        visited = random.sample(owners, visits)
+        people.append({
+            "username": username,
+            "fullname": "Customer " + str(i),
+            "hashed_password": password,
+            "favourite": [owner["_id"] for owner in visited[:2]]
+        })
+        for owner in visited:
+            board = owner["bingo_board"]["board"]
+            positions = random.sample(range(len(board)),
+                                      random.randint(0, len(board) - 1))
+            progress.append({
+                "customer": username,
+                "restaurant_id": owner["_id"],
+                "epoch": 0,
+                "completed_goals": [{
+                    "_id": board[position],
+                    "position": str(position),
+                    "epoch": 0,
+                    "date_completed": now
+                } for position in positions]
+            })
+            if random.random() < 0.5:
+                reward_id = owner["bingo_board"]["board_reward"][0]
+                redemption = {
+                    "redemption_code": "%s+%s+0+%d" %
+                                       (username, reward_id, len(redemptions)),
+                    "restaurant_id": owner["_id"],
+                    "customer": username,
+                    "reward_id": reward_id,
+                    "text": "Shared reward",
+                    "is_redeemed": random.random() < 0.5,
+                    "issue_date": now
+                }
+                if redemption["is_redeemed"]:
+                    redemption["redemption_date"] = now
+                redemptions.append(redemption)
+    db["customers"].insert_many(people)
+    db["progress"].insert_many(progress)
+    db["redemptions"].insert_many(redemptions)
+    return {
+        "owners": owners,
+        "customers": people,
+        "progress": progress,
+        "redemptions": redemptions,
+        "goals": goals,
+        "rewards": rewards
+    }
@@ -0,0 +1,31 @@
+"""
+This is the gunicorn configuration shared by both apps. It keeps the metrics
+of every worker process in prometheus_multiproc_dir, if set, and leaves board
+rotation to the rotation process (see Procfile) rather than every worker.
+"""
+
+import os
+import glob
+from prometheus_client import multiprocess
+
+# Read by the workers as they load the app
+os.environ.setdefault("BYTES_BOARD_ROTATION_INTERVAL", "0")
+
+
+def on_starting(server):
+    """
+    Clear the metrics left by a previous run.
+    """
+    path = os.environ.get("prometheus_multiproc_dir")
+    if path:
+        os.makedirs(path, exist_ok=True)
+        for metrics_file in glob.glob(os.path.join(path, "*.db")):
+            os.remove(metrics_file)
+
+
+def child_exit(server, worker):
+    """
+    Stop reporting the live metrics of a worker once it exits.
+    """
+    if os.environ.get("prometheus_multiproc_dir"):
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,85 @@
+"""
+This file houses the bingo line engine shared by the customer and owner
+interfaces. Board cells are numbered left to right, top to bottom, and a set of
+completed cells is represented as an integer bitmask where bit i is set when
+cell i is complete.
+
+Lines are numbered in the same order as a board's rewards: the ascending
+diagonal first, then each row, then each column, then the descending diagonal.
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_lines(size):
+    """
+    Return a tuple holding the cells of every line of a board of the given
+    size, in reward order.
+    """
+    ascending = tuple((size - 1) * i for i in range(1, size + 1))
+    rows = [tuple(range(row * size, (row + 1) * size)) for row in range(size)]
+    columns = [
+        tuple(range(column, size * size, size)) for column in range(size)
+    ]
+    descending = tuple((size + 1) * i for i in range(size))
+    return tuple([ascending] + rows + columns + [descending])
+
+
+@lru_cache(maxsize=None)
+def get_line_masks(size):
+    """
+    Return a tuple holding the bitmask of every line of a board of the given
+    size, in reward order.
+    """
+    return tuple(get_cells_mask(line) for line in get_lines(size))
+
+
+@lru_cache(maxsize=None)
+def get_lines_through(position, size):
+    """
+    Return a tuple of the lines that pass through the given cell.
+    """
+    return tuple(index for index, mask in enumerate(get_line_masks(size))
+                 if mask >> position & 1)
+
+
+def get_cells_mask(positions):
+    """
+    Return the bitmask of the given cell positions. Positions may be given as
+    ints or numeric strings (i.e "3"), as stored with completed goals.
+    """
+    mask = 0
+    for position in positions:
+        mask |= 1 << int(position)
+    return mask
+
+
+def is_board_complete(mask, size):
+    """
+    Return True if every cell of a board of the given size is in the mask.
+    """
+    full = (1 << size * size) - 1
+    return mask & full == full
+
+
+def get_completed_lines(mask, size):
+    """
+    Return the lines, in reward order, whose cells are all in the mask.
+    """
+    return [
+        index for index, line in enumerate(get_line_masks(size))
+        if mask & line == line
+    ]
+
+
+def get_new_lines(mask, position, size):
+    """
+    Return the lines completed by completing the given cell, given the mask
+    of completed cells including it.
+    """
+    masks = get_line_masks(size)
+    return [
+        index for index in get_lines_through(int(position), size)
+        if mask & masks[index] == masks[index]
+    ]
@@ -0,0 +1,94 @@
+"""
+This file houses the in-process cache used to keep rarely changing data in
+memory. Each server process (i.e gunicorn worker) holds its own copy.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from modules.metrics import CACHE_REQUESTS
+
+# Seconds the shared goal and reward catalogs are kept before being re-read
+CATALOG_TTL = int(os.environ.get("BYTES_CATALOG_TTL", 300))
+
+# Seconds restaurant names are kept before being re-read
+NAME_TTL = int(os.environ.get("BYTES_NAME_TTL", 600))
+
+# Seconds a logged in user's credentials are kept before being re-read
+USER_TTL = int(os.environ.get("BYTES_USER_TTL", 60))
+
+
+class TTLCache():
+    """
+    This class generates a thread-safe cache whose entries expire ttl seconds
+    after being set (never, if ttl is None). If maxsize is given, the least
+    recently used entries are evicted to stay within it. Hits and misses are
+    counted to measure the cache's effectiveness, and reported in the metrics
+    under the cache's name if it has one.
+    """
+
+    def __init__(self, ttl, maxsize=None, name=None):
+        """
+        Initialize an empty cache with the given time to live and size limit.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self.entries = OrderedDict()  # Maps key to (expiry time, value)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        Return the value cached under key, or default if there is no such
+        value or it has expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (entry[0] is None or
+                                      entry[0] > time.monotonic()):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                hit = True
+            else:
+                self.entries.pop(key, None)
+                self.misses += 1
+                hit = False
+        if self.name is not None:
+            CACHE_REQUESTS.labels(self.name, "hit" if hit else "miss").inc()
+        return entry[1] if hit else default
+
+    def set(self, key, value):
+        """
+        Cache a value under key, evicting the least recently used entry if
+        the cache is full.
+        """
+        expiry = None if self.ttl is None else time.monotonic() + self.ttl
+        with self.lock:
+            self.entries[key] = (expiry, value)
+            self.entries.move_to_end(key)
+            if self.maxsize is not None and len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """
+        Remove the value cached under key, or every value if no key is given.
+        """
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def get_stats(self):
+        """
+        Return the cache's hit and miss counts along with its current size.
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.entries)
+            }
@@ -3,40 +3,25 @@ This file houses the customer board interface.
 It is used to interact with the customer profile database for boards.
 """
 from bson.objectid import ObjectId
+from bson.errors import InvalidId
 from modules.database import QueryFailureException, UpdateFailureException
 from modules.owner.restaurant_profile_manager import RestaurantProfileManager
+from modules.owner.game_board import GameBoardManager, get_board_epoch
+from modules import bingo
 
 
 def check_bingo(board, completed_indices, size):
     """
 	Helper function to update a board with the customer's bingos.
 	"""
-    a_diag = size - 1
-    d_diag = size + 1
-    ranges = [[]]
-    for i in range(1, size + 1):
-        ranges[0].append(a_diag * i)
-    for i in range(0, size * size, size):
-        ranges.append([x for x in range(i, i + size)])
-    for i in range(size):
-        ranges.append([x for x in range(size * size) if x % size == i])
-    ranges.append([])
-    for i in range(0, size):
-        ranges[-1].append(d_diag * i)
-
-    if len(completed_indices) == size * size:
+    mask = bingo.get_cells_mask(completed_indices)
+    if bingo.is_board_complete(mask, size):
         board["board"][0]["board_complete"] = True
-    count = 0
-    for rang in ranges:
-        is_bingo = True
-        for i in rang:
-            if i not in completed_indices:
-                is_bingo = False
-        if is_bingo:
-            for i in rang:
-                board["board"][i]["is_bingo"] = True
-                board["board_reward"][count]["is_earned"] = True
-        count += 1
+    lines = bingo.get_lines(size)
+    for line in bingo.get_completed_lines(mask, size):
+        for i in lines[line]:
+            board["board"][i]["is_bingo"] = True
+        board["board_reward"][line]["is_earned"] = True
 
 
 def set_board_progress(cpm, board, rest_id):
@@ -61,25 +46,41 @@ def set_board_progress(cpm, board, rest_id):
         # assign complete for all goals the customer completed
         # assign bingo for all goals that make up a bingo that the customer completed
         # assign earned for all rewards that are earned
-        customer = cpm.db.query("customers", {"username": cpm.id})[0]
-        if "progress" in customer:
-            for restaurant in customer["progress"]:
-                if restaurant["restaurant_id"] == rest_id:
-                    for goal in restaurant["completed_goals"]:
-                        completed_index = [
-                            int(x["position"])
-                            for x in restaurant["completed_goals"]
-                        ]
-                        index = int(goal["position"])
-                        if board["board"][index]["_id"] == goal["_id"]:
-                            board["board"][index]["is_complete"] = True
-                            check_bingo(board, completed_index,
-                                        board["size"])
+        progress = cpm.db.query(
+            "progress", {
+                "customer": cpm.id,
+                "restaurant_id": rest_id,
+                "epoch": get_board_epoch(board)
+            }, {"completed_goals": 1})
+        if progress:
+            completed_index = []
+            for goal in progress[0]["completed_goals"]:
+                index = int(goal["position"])
+                if index < len(board["board"]) and \
+                        board["board"][index]["_id"] == goal["_id"]:
+                    board["board"][index]["is_complete"] = True
+                    completed_index.append(index)
+            check_bingo(board, completed_index, board["size"])
 
     except QueryFailureException:
         print("Something's wrong with the query.")
-    except IndexError:
-        print("Could not find the customer")
+
+
+def get_board_view(cpm, rest_id):
+    """
+	Return the given restaurant's bingo board with the customer's progress,
+	ready to render. This costs one query for the board with its custom goals
+	and rewards and one for the customer's progress; shared goals and rewards
+	come from their cache. Returns None if the restaurant has no board.
+	"""
+    board = GameBoardManager(
+        RestaurantProfileManager("")).get_restaurant_board_by_id(rest_id)
+    if not board or board["board"] == []:
+        return None
+    set_board_progress(cpm, board, rest_id)
+    board["expiry_date"] = board["expiry_date"].strftime(
+        "%B X%d, %Y - X%I:%M %p UTC").replace("X0", "X").replace("X", "")
+    return board
 
 
 def reset_complete_board(cpm, rest_id):
@@ -87,14 +88,22 @@ def reset_complete_board(cpm, rest_id):
 	Clears the bingo board once the entire board has been filled.
 	"""
     try:
-        cpm.db.update('customers', {
-            "username": cpm.id,
-            "progress.restaurant_id": rest_id
-        }, {"$set": {
-            "progress.$.completed_goals": []
-        }})
+        owner = cpm.db.query("restaurant_users", {"_id": ObjectId(rest_id)},
+                             {"bingo_board.epoch": 1})[0]
+        cpm.db.update(
+            'progress', {
+                "customer": cpm.id,
+                "restaurant_id": owner["_id"],
+                "epoch": get_board_epoch(owner.get("bingo_board", {}))
+            }, {"$set": {
+                "completed_goals": []
+            }})
     except UpdateFailureException:
         print("There was an issue updating")
+    except QueryFailureException:
+        print("Something's wrong with the query.")
+    except (IndexError, InvalidId):
+        print("Could not find the restaurant")
 
 
 def get_reward_progress(cpm):
@@ -104,30 +113,34 @@ def get_reward_progress(cpm):
 	Returns ([], []) on failure.
 	"""
     try:
-        customer = cpm.db.query("customers", {"username": cpm.id})[0]
-
-        # no game progress
-        if "progress" not in customer:
-            return ([], [])
-
+        rewards = cpm.db.query("redemptions", {"customer": cpm.id}, {
+            "_id": 0,
+            "redemption_code": 1,
+            "restaurant_id": 1,
+            "text": 1,
+            "is_redeemed": 1,
+            "redemption_date": 1
+        },
+                               sort=[("_id", 1)],
+                               stream=True)
+
+        # add each reward to the appropriate collection as it is read
         active_rewards = []
         redeemed_rewards = []
-        for resaurant in customer["progress"]:
-
-            # no rewards completed at this restaurant
-            if "completed_rewards" not in resaurant:
-                continue
-
-            restaurant_name = RestaurantProfileManager(
-                "").get_restaurant_name_by_id(resaurant["restaurant_id"])
-
-            # add rewards to appropriate collection
-            for reward in resaurant["completed_rewards"]:
-                reward["restaurant_name"] = restaurant_name
-                if reward["is_redeemed"]:
-                    redeemed_rewards.append(reward)
-                else:
-                    active_rewards.append(reward)
+        for reward in rewards:
+            if reward["is_redeemed"]:
+                redeemed_rewards.append(reward)
+            else:
+                active_rewards.append(reward)
+
+        # look up every restaurant's name at once
+        names = RestaurantProfileManager.get_restaurant_names_by_ids([
+            reward["restaurant_id"]
+            for reward in active_rewards + redeemed_rewards
+        ])
+        for reward in active_rewards + redeemed_rewards:
+            reward["restaurant_name"] = names.get(reward.pop("restaurant_id"),
+                                                  "")
 
         # sort redeemed rewards by date
         redeemed_rewards = sorted(redeemed_rewards,
@@ -144,6 +157,3 @@ def get_reward_progress(cpm):
     except QueryFailureException:
         print("Something's wrong with the query.")
         return ([], [])
-    except IndexError:
-        print("Could not find the customer")
-        return ([], [])
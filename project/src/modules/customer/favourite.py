@@ -3,7 +3,8 @@ This file houses the customer favourite interface.
 It is used to interact with the customer profile database for favourites.
 """
 from bson.objectid import ObjectId
-from modules.database import QueryFailureException
+from bson.errors import InvalidId
+from modules.database import QueryFailureException, UpdateFailureException
 
 
 def get_favourite(cpm):
@@ -11,7 +12,8 @@ def get_favourite(cpm):
     Gets the list of user's favourite restaurant Ids
 	"""
     try:
-        customer = cpm.db.query("customers", {"username": cpm.id})[0]
+        customer = cpm.db.query("customers", {"username": cpm.id},
+                                {"favourite": 1})[0]
         if "favourite" in customer:
             return customer["favourite"]
         else:
@@ -24,31 +26,41 @@ def get_favourite(cpm):
 
 def update_favourite(cpm, obj_id):
     """
-	Updates the list of user's favourite restaurant Ids
+	Adds the given restaurant to the list of user's favourite restaurant Ids, or
+	removes it if it is already there, in a single atomic update.
+	Returns the updated list.
 	"""
     try:
-        customer = cpm.db.query("customers", {"username": cpm.id})[0]
-        if "favourite" not in customer:
-            cpm.db.update("customers", {"username": cpm.id},
-                          {"$push": {
-                              "favourite": ObjectId(obj_id)
-                          }})
-        else:
-            if ObjectId(obj_id) in customer["favourite"]:
-                cpm.db.update('customers', {"username": cpm.id},
-                              {"$pull": {
-                                  "favourite": ObjectId(obj_id)
-                              }})
-            else:
-                cpm.db.update('customers', {"username": cpm.id},
-                              {"$push": {
-                                  "favourite": ObjectId(obj_id)
-                              }})
-        return get_favourite(cpm)
-    except QueryFailureException:
-        print("Something's wrong with the query.")
-    except IndexError:
-        print("Could not find the customer")
+        rest_id = ObjectId(obj_id)
+        favourite = {"$ifNull": ["$favourite", []]}
+        customer = cpm.db.find_one_and_update("customers", {
+            "username": cpm.id
+        }, [{
+            "$set": {
+                "favourite": {
+                    "$cond": [{
+                        "$in": [rest_id, favourite]
+                    }, {
+                        "$filter": {
+                            "input": favourite,
+                            "cond": {
+                                "$ne": ["$$this", rest_id]
+                            }
+                        }
+                    }, {
+                        "$concatArrays": [favourite, [rest_id]]
+                    }]
+                }
+            }
+        }], {"favourite": 1})
+        if customer is None:
+            print("Could not find the customer")
+            return None
+        return customer["favourite"]
+    except UpdateFailureException:
+        print("There was an issue updating")
+    except InvalidId:
+        print("Invalid restaurant id")
 
 
 def get_favourite_doc(profiles, favourite):
@@ -4,8 +4,15 @@ CRUD operations and provided custom error handling.
 """
 
 import os
+import copy
+import time
 from flask_pymongo import PyMongo, ObjectId  # Import Flask-PyMongo utilities
-from flask import current_app
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from flask import current_app, g, has_app_context
+from modules.instrumentation import track, record_call
 
 
 class QueryFailureException(Exception):
@@ -26,6 +33,38 @@ class InsertFailureException(Exception):
     """
 
 
+class IndexFailureException(Exception):
+    """
+    Exception class used to indicate failure creating a database index.
+    """
+
+
+# Fields holding ObjectIds in each collection, by path. Id strings in queries
+# are converted only for these fields; other collections only convert _id.
+ID_FIELDS = {
+    "restaurant_users": {
+        "_id", "goals._id", "rewards._id", "bingo_board.board",
+        "bingo_board.board_reward", "future_board.board",
+        "future_board.board_reward"
+    },
+    "customers": {"_id", "favourite"},
+    "progress": {"_id", "restaurant_id", "completed_goals._id"},
+    "redemptions": {"_id", "restaurant_id", "reward_id"},
+    None: {"_id"}
+}
+
+# Codec options of collections whose documents are decoded lazily
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+# Paths of the arrays or subdocuments containing each collection's id fields
+ID_PARENTS = {
+    collection: {
+        field[:index] for field in fields
+        for index, char in enumerate(field) if char == "."
+    } for collection, fields in ID_FIELDS.items()
+}
+
+
 class Database:
     """
     This class holds all database communication components. It is responsible
@@ -49,23 +88,133 @@ class Database:
         return Database.instance
 
     @staticmethod
-    def replace_object_id(document):
+    def configure(backend):
         """
-        Replace all _id values in a JSON-style dictionary document with
-        the MongoDB ObjectID type value. This is a requirement when using
-        MongoDB's unique IDs. (i.e # Update entry matching
-        {_id: "sdfr23hfk23f23"} to {_id: ObjectID("sdfr23hfk23f23")})
+        Make the database instance use the given backend instead of the
+        remote database, and return it. The backend must behave like a
+        pymongo database (i.e a mongomock database), which is used to run
+        the apps against a local stand-in in benchmarks and tests.
         """
-        if isinstance(document, dict):
+        instance = Database.__new__(Database)
+        instance.db = backend
+        Database.instance = instance
+        return instance
+
+    @staticmethod
+    def to_object_id(value):
+        """
+        Return the given id value with every valid id string converted to an
+        ObjectId. Lists and operator dictionaries (i.e {"$in": [...]}) are
+        converted item by item; anything else is returned as is.
+        """
+        if isinstance(value, ObjectId):
+            return value
+        if isinstance(value, str):
+            return ObjectId(value) if ObjectId.is_valid(value) else value
+        if isinstance(value, list):
+            return [Database.to_object_id(item) for item in value]
+        if isinstance(value, dict):
             return {
-                key: Database.replace_object_id(val)
-                for key, val in document.items()
+                key: Database.to_object_id(item)
+                for key, item in value.items()
             }
-        if isinstance(document, list):
-            return [Database.replace_object_id(val) for val in document]
-        if isinstance(document, str) and ObjectId.is_valid(document):
-            return ObjectId(document)
-        return document
+        return value
+
+    @staticmethod
+    def convert_ids(collection, query, prefix=""):
+        """
+        Return the given query with the values of the collection's id fields,
+        as declared in ID_FIELDS, converted to ObjectIds. (i.e
+        {"_id": "5ef5009bccd1e88ead4cd076"} becomes
+        {"_id": ObjectId("5ef5009bccd1e88ead4cd076")}) Other fields are left
+        alone, so a username or goal text that looks like an id stays a
+        string. Only the parts of the query naming id fields are copied.
+        """
+        fields = ID_FIELDS.get(collection, ID_FIELDS[None])
+        parents = ID_PARENTS.get(collection, ID_PARENTS[None])
+        converted = None
+        for key, value in query.items():
+            path = prefix + key
+            if key in ("$and", "$or", "$nor"):
+                new = [
+                    Database.convert_ids(collection, part, prefix)
+                    for part in value
+                ]
+            elif path in fields:
+                new = Database.to_object_id(value)
+            elif path in parents and isinstance(value, dict):
+                new = Database.convert_array_ids(collection, value, path + ".")
+            else:
+                continue
+            if converted is None:
+                converted = dict(query)
+            converted[key] = new
+        return query if converted is None else converted
+
+    @staticmethod
+    def convert_array_ids(collection, operators, prefix):
+        """
+        Return the given operators on an array of subdocuments (i.e
+        {"$elemMatch": {...}} or {"$not": {"$elemMatch": {...}}}) with the id
+        fields of the subdocuments they match converted to ObjectIds.
+        """
+        converted = dict(operators)
+        for operator, value in operators.items():
+            if operator == "$elemMatch":
+                converted[operator] = Database.convert_ids(
+                    collection, value, prefix)
+            elif operator == "$not" and isinstance(value, dict):
+                converted[operator] = Database.convert_array_ids(
+                    collection, value, prefix)
+        return converted
+
+    @staticmethod
+    def covers_projection(cached, requested):
+        """
+        Return True if documents fetched using the cached projection contain
+        every field named by the requested projection. A projection of None
+        fetches whole documents and covers everything.
+        """
+        if cached is None:
+            return True
+        if requested is None:
+            return False
+        if cached.get("_id", 1) == 0 and requested.get("_id", 1) != 0:
+            return False
+        for field, value in requested.items():
+            if field == "_id":
+                continue
+            if value != 1:  # Operators and exclusions must match exactly
+                if cached.get(field) != value:
+                    return False
+                continue
+            if not any(field == key or field.startswith(key + ".")
+                       for key, val in cached.items() if val == 1):
+                return False
+        return True
+
+    @staticmethod
+    def get_identity_map():
+        """
+        Return the identity map of the current request, which holds the
+        documents already fetched while serving it. Returns None when there
+        is no app context to attach the map to.
+        """
+        if not has_app_context():
+            return None
+        if "identity_map" not in g:
+            g.identity_map = {}
+        return g.identity_map
+
+    @staticmethod
+    def invalidate(collection):
+        """
+        Discard every document of the given collection held by the current
+        request's identity map.
+        """
+        identity_map = Database.get_identity_map()
+        if identity_map is not None:
+            identity_map.pop(collection, None)
 
     def __init__(self):
         """
@@ -84,28 +233,182 @@ class Database:
         self.db = PyMongo(current_app).db
         Database.instance = self
 
-    def query(self, collection, query={}):
+    def query(self,
+              collection,
+              query={},
+              projection=None,
+              sort=None,
+              limit=0,
+              stream=False,
+              raw=False):
         """
         Locate a list of documents matching a query, from a given collection
         in the db. By default, the query matches all documents in the
-        collection. Throws QueryFailureException on failure.
+        collection. If a projection is given, only the fields it names are
+        fetched (i.e {"profile": 1}). sort is a list of (key, direction) pairs
+        and limit caps the number of documents returned (0 means no limit).
+        Results are kept in the request's identity map, so repeating a query
+        whose fields were already fetched does not reach the db.
+        For large listings and scans, stream returns an iterator fetching the
+        documents in batches as they are read, instead of a list, and raw
+        decodes each document lazily, as its fields are read. Raw documents
+        are read-only mappings (see bson.raw_bson.RawBSONDocument). Streamed
+        and raw documents bypass the identity map.
+        Throws QueryFailureException on failure, which for streamed documents
+        may happen while they are read.
         """
         try:
-            query = Database.replace_object_id(
-                query)  # Update all _id keys for use with Mongo
-            return list(self.db[collection].find(query))
+            query = Database.convert_ids(
+                collection, query)  # Update all id fields for use with Mongo
+            if stream:
+                return self.stream(collection, query, projection, sort, limit,
+                                   raw)
+            identity_map = Database.get_identity_map()
+            if identity_map is None or raw:
+                with track("find", collection, query):
+                    return list(
+                        self.find(collection, query, projection, sort, limit,
+                                  raw))
+
+            entries = identity_map.setdefault(collection, {}).setdefault(
+                repr((query, sort, limit)), [])
+            for cached_projection, documents in entries:
+                if Database.covers_projection(cached_projection, projection):
+                    return copy.deepcopy(documents)
+            with track("find", collection, query):
+                documents = list(
+                    self.find(collection, query, projection, sort, limit))
+            entries.append((projection, documents))
+            return copy.deepcopy(documents)
         except TypeError as error:
             print(error)
             raise QueryFailureException("TypeError was found!")
 
+    def stream(self, collection, query, projection, sort, limit, raw):
+        """
+        Yield the documents matching a query as they are fetched, bypassing
+        the identity map. The time spent fetching them, but not reading them,
+        is recorded as a single call once they are all read or the iterator is
+        closed. Throws QueryFailureException on failure.
+        """
+        seconds = 0
+        cursor = None
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    if cursor is None:
+                        cursor = self.find(collection, query, projection, sort,
+                                           limit, raw)
+                    document = next(cursor)
+                except StopIteration:
+                    return
+                except (TypeError, OperationFailure) as error:
+                    print(error)
+                    raise QueryFailureException("Failed to read documents!")
+                finally:
+                    seconds += time.perf_counter() - start
+                yield document
+        finally:
+            record_call("find", collection, query, seconds)
+
+    def find(self,
+             collection,
+             query,
+             projection=None,
+             sort=None,
+             limit=0,
+             raw=False):
+        """
+        Return a cursor over the documents matching a query, bypassing the
+        identity map. The query is used as given. If raw is set, documents are
+        decoded lazily where the backend supports it; others (i.e mongomock)
+        return fully decoded documents.
+        """
+        db_collection = self.db[collection]
+        if raw:
+            try:
+                db_collection = db_collection.with_options(
+                    codec_options=RAW_CODEC_OPTIONS)
+            except NotImplementedError:  # Backend always decodes documents
+                pass
+        cursor = db_collection.find(query, projection, limit=limit)
+        if sort:
+            cursor = cursor.sort(sort)
+        return cursor
+
     def update(self, collection, query, document):
         """
         Update the first document from a collection in the db who matches a
         given query. Throws UpdateFailureException on failure.
         """
-        query = Database.replace_object_id(
-            query)  # Update all _id keys for use with Mongo
-        res = self.db[collection].update_one(query, document)
+        query = Database.convert_ids(
+            collection, query)  # Update all id fields for use with Mongo
+        Database.invalidate(collection)
+        with track("update", collection, query):
+            res = self.db[collection].update_one(query, document)
+        if not res.acknowledged:
+            raise UpdateFailureException("Failed to update!")
+        return res
+
+    def find_one_and_update(self,
+                            collection,
+                            query,
+                            document,
+                            projection=None,
+                            upsert=False):
+        """
+        Atomically update the first document from a collection in the db who
+        matches a given query, and return the document as it is after the
+        update. Only fields named by the projection are returned, if given.
+        If upsert is set, a document is inserted when none matches. If the
+        inserted document would duplicate a unique index key, another request
+        inserted it first, so the update is retried once without upsert.
+        Returns None if no document matches. Throws UpdateFailureException on
+        failure.
+        """
+        query = Database.convert_ids(
+            collection, query)  # Update all id fields for use with Mongo
+        Database.invalidate(collection)
+        try:
+            try:
+                with track("find_one_and_update", collection, query):
+                    return self.db[collection].find_one_and_update(
+                        query,
+                        document,
+                        projection,
+                        upsert=upsert,
+                        return_document=ReturnDocument.AFTER)
+            except DuplicateKeyError:
+                if not upsert:
+                    return None
+            # Mongo does not retry upserts whose query is not only equalities
+            with track("find_one_and_update", collection, query):
+                return self.db[collection].find_one_and_update(
+                    query,
+                    document,
+                    projection,
+                    return_document=ReturnDocument.AFTER)
+        except DuplicateKeyError:  # A document exists, but did not match
+            return None
+        except OperationFailure as error:
+            print(error)
+            raise UpdateFailureException("Failed to update!")
+
+    def update_many(self, collection, query, document, array_filters=None):
+        """
+        Update every document from a collection in the db who matches a given
+        query in a single server-side operation. array_filters selects the
+        array elements that $[<identifier>] paths in the update apply to.
+        Throws UpdateFailureException on failure.
+        """
+        query = Database.convert_ids(
+            collection, query)  # Update all id fields for use with Mongo
+        Database.invalidate(collection)
+        with track("update_many", collection, query):
+            res = self.db[collection].update_many(query,
+                                                  document,
+                                                  array_filters=array_filters)
         if not res.acknowledged:
             raise UpdateFailureException("Failed to update!")
         return res
@@ -113,9 +416,66 @@ class Database:
     def insert(self, collection, document):
         """
         Insert a single document into the given collection within the db.
-        Throws InsertFailureException on failure.
+        Throws InsertFailureException on failure, including when the document
+        would duplicate a unique index key.
         """
-        res = self.db[collection].insert_one(document)  # Insert using Mongo
+        Database.invalidate(collection)
+        try:
+            with track("insert", collection):
+                res = self.db[collection].insert_one(
+                    document)  # Insert using Mongo
+        except OperationFailure as error:
+            print(error)
+            raise InsertFailureException("Failed to insert!")
         if not res.acknowledged:  # Ensure successful insert
             raise InsertFailureException("Failed to insert!")
         return res
+
+    def bulk_write(self, collection, operations):
+        """
+        Send a list of write operations (i.e pymongo.UpdateOne) for a
+        collection to the db in a single request. Operations are unordered, so
+        one failing does not stop the others. Throws UpdateFailureException if
+        any operation fails.
+        """
+        Database.invalidate(collection)
+        if not operations:  # Mongo refuses empty batches
+            return None
+        try:
+            with track("bulk_write", collection):
+                return self.db[collection].bulk_write(operations,
+                                                      ordered=False)
+        except BulkWriteError as error:
+            print(error.details["writeErrors"])
+            raise UpdateFailureException("Failed to update!")
+
+    def aggregate(self, collection, pipeline):
+        """
+        Run an aggregation pipeline on the given collection within the db and
+        return the resulting list of documents. Throws QueryFailureException
+        on failure.
+        """
+        try:
+            with track("aggregate", collection, pipeline):
+                return list(self.db[collection].aggregate(pipeline))
+        except (TypeError, OperationFailure) as error:
+            print(error)
+            raise QueryFailureException("Failed to aggregate!")
+
+    def create_index(self, collection, keys, **options):
+        """
+        Create an index on the given collection within the db, unless it
+        already exists. Throws IndexFailureException on failure.
+        """
+        try:
+            return self.db[collection].create_index(keys, **options)
+        except OperationFailure as error:
+            print(error)
+            raise IndexFailureException("Failed to create index!")
+
+    def get_indexes(self, collection):
+        """
+        Return a dictionary of the indexes on the given collection within the
+        db, keyed by index name.
+        """
+        return self.db[collection].index_information()
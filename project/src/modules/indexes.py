@@ -0,0 +1,122 @@
+"""
+This file houses the index management components. It declares every index our
+queries rely on and keeps the database's indexes in line with them.
+"""
+
+from pymongo import ASCENDING
+from modules.database import Database, IndexFailureException, QueryFailureException
+
+# Indexes required by the apps' queries, given as (collection, keys, options).
+# Every collection is also indexed on _id by MongoDB itself.
+INDEXES = [
+    ("restaurant_users", [("username", ASCENDING)], {
+        "unique": True
+    }),
+    ("restaurant_users", [("profile.is_public", ASCENDING),
+                          ("_id", ASCENDING)], {}),
+    ("restaurant_users", [("profile.is_public", ASCENDING),
+                          ("profile.category", ASCENDING),
+                          ("_id", ASCENDING)], {}),
+    ("restaurant_users", [("profile.is_public", ASCENDING),
+                          ("profile.location.city", ASCENDING),
+                          ("_id", ASCENDING)], {}),
+    ("restaurant_users", [("bingo_board.expiry_date", ASCENDING)], {}),
+    ("customers", [("username", ASCENDING)], {
+        "unique": True
+    }),
+    ("progress", [("customer", ASCENDING), ("restaurant_id", ASCENDING),
+                  ("epoch", ASCENDING)], {
+                      "unique": True
+                  }),
+    ("redemptions", [("redemption_code", ASCENDING)], {
+        "unique": True
+    }),
+    ("redemptions", [("restaurant_id", ASCENDING)], {}),
+    ("redemptions", [("customer", ASCENDING)], {}),
+]
+
+def get_index_name(keys):
+    """
+    Return the name MongoDB gives an index on the given keys
+    (i.e [("username", 1)] is named "username_1").
+    """
+    return "_".join("%s_%s" % (field, direction) for field, direction in keys)
+
+
+class IndexManager():
+    """
+    This class generates an index manager capable of creating the declared
+    indexes and reporting on how the database's indexes differ from them.
+    """
+
+    def __init__(self, database=None):
+        """
+        Initialize an index manager using the given database, or the shared
+        database instance if none is given.
+        """
+        self.db = database if database is not None else Database.get_instance()
+
+    def ensure_indexes(self, strict=False):
+        """
+        Create every declared index that does not exist yet. Existing indexes
+        are left untouched, so this is safe to run on every startup. Return
+        the list of indexes that could not be created. If strict is set,
+        throws IndexFailureException when a unique index could not be
+        created instead, as writes rely on them to reject duplicates (i.e a
+        goal completed twice by concurrent scans).
+        """
+        failed = []
+        for collection, keys, options in INDEXES:
+            try:
+                self.db.create_index(collection,
+                                     keys,
+                                     name=get_index_name(keys),
+                                     **options)
+            except IndexFailureException:
+                print("There was an issue creating an index on " + collection)
+                if strict and options.get("unique"):
+                    raise
+                failed.append((collection, get_index_name(keys)))
+        return failed
+
+    def get_missing_indexes(self):
+        """
+        Return a list of (collection, index name) for every declared index
+        that does not exist in the database.
+        """
+        missing = []
+        existing = {}
+        for collection, keys, _ in INDEXES:
+            if collection not in existing:
+                existing[collection] = self.db.get_indexes(collection)
+            if get_index_name(keys) not in existing[collection]:
+                missing.append((collection, get_index_name(keys)))
+        return missing
+
+    def get_unused_indexes(self):
+        """
+        Return a list of (collection, index name) for every index that has
+        not served a single operation since the database server started.
+        Collections whose usage statistics are unavailable are skipped.
+        """
+        unused = []
+        for collection in sorted({index[0] for index in INDEXES}):
+            try:
+                stats = self.db.aggregate(collection, [{"$indexStats": {}}])
+            except QueryFailureException:
+                print("Index usage is unavailable for " + collection)
+                continue
+            for stat in stats:
+                if stat["name"] != "_id_" and stat["accesses"]["ops"] == 0:
+                    unused.append((collection, stat["name"]))
+        return unused
+
+    def get_report(self):
+        """
+        Return a dictionary describing declared indexes that are missing and
+        existing indexes that are unused.
+        """
+        return {
+            "missing": self.get_missing_indexes(),
+            "unused": self.get_unused_indexes()
+        }
@@ -0,0 +1,84 @@
+"""
+This file houses the database instrumentation. Every round trip to the
+database made while handling a request is timed and recorded along with its
+collection and filter shape, to find out what each route costs. Calls can
+also be recorded across requests, which tests use to hold routes to a budget
+of round trips.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from flask import g, has_app_context
+from modules.metrics import DB_CALL_LATENCY
+
+# Requests taking longer than this many milliseconds are logged with their
+# database calls
+SLOW_REQUEST_MS = float(os.environ.get("BYTES_SLOW_REQUEST_MS", 500))
+
+# Lists receiving every database call made while record_calls is active
+RECORDERS = []
+
+
+def get_query_shape(query):
+    """
+    Return the shape of a query: its fields and operators with every value
+    replaced by "?" (i.e {"username": "bob"} has shape {"username": "?"}), so
+    that calls differing only in their values can be grouped.
+    """
+    if isinstance(query, dict):
+        return {key: get_query_shape(value) for key, value in query.items()}
+    if isinstance(query, list) and query and isinstance(query[0], dict):
+        return [get_query_shape(value) for value in query]
+    return "?"
+
+
+def get_calls():
+    """
+    Return the list of (operation, collection, query shape, seconds) of the
+    database calls made so far in the current app context.
+    """
+    if not has_app_context():
+        return []
+    return g.setdefault("db_calls", [])
+
+
+@contextmanager
+def track(operation, collection, query=None):
+    """
+    Time the database call made within the block and record it in the
+    current app context and the metrics, whether or not it succeeds.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_call(operation, collection, query, time.perf_counter() - start)
+
+
+def record_call(operation, collection, query, seconds):
+    """
+    Record a database call that took the given number of seconds in the
+    current app context, the metrics and every active record_calls block.
+    """
+    DB_CALL_LATENCY.labels(collection, operation).observe(seconds)
+    call = (operation, collection, get_query_shape(query), seconds)
+    if has_app_context():
+        get_calls().append(call)
+    for recorder in RECORDERS:
+        recorder.append(call)
+
+
+@contextmanager
+def record_calls():
+    """
+    Record the database calls made within the block into the yielded list,
+    whichever app context or request they are made in. (i.e with
+    record_calls() as calls: client.get("/"); assert len(calls) <= 2)
+    """
+    calls = []
+    RECORDERS.append(calls)
+    try:
+        yield calls
+    finally:
+        RECORDERS.remove(calls)
@@ -0,0 +1,120 @@
+"""
+This file houses the latency-injecting database backend. It wraps a local
+database (i.e a mongomock database) so that every round trip waits as long as
+one to the remote database would, and counts the round trips made. Used with
+Database.configure, it reproduces production's latency on a laptop.
+"""
+
+import time
+import random
+import threading
+from collections import Counter
+
+# Collection methods that make a round trip to the database
+ROUND_TRIP_METHODS = {
+    "find", "find_one", "find_one_and_update", "find_one_and_delete",
+    "find_one_and_replace", "insert_one", "insert_many", "update_one",
+    "update_many", "replace_one", "delete_one", "delete_many", "bulk_write",
+    "aggregate", "count_documents", "distinct", "create_index", "drop_index",
+    "index_information"
+}
+
+
+class LatencyBackend():
+    """
+    This class generates a database backend that delays every round trip to
+    the given backend by latency_ms milliseconds, plus or minus up to
+    jitter_ms. latencies may override the latency of specific operations
+    (i.e {"find": 20, "update_one": 40}). Round trips are counted by
+    (collection, operation).
+    """
+
+    def __init__(self,
+                 backend,
+                 latency_ms=0,
+                 jitter_ms=0,
+                 latencies=None,
+                 random_seed=None):
+        """
+        Initialize a backend wrapping the given pymongo-like database.
+        """
+        self.backend = backend
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.latencies = latencies or {}
+        self.random = random.Random(random_seed)
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def __getitem__(self, collection):
+        """
+        Return the given collection, with its round trips delayed.
+        """
+        return LatencyCollection(self, collection, self.backend[collection])
+
+    def get_delay(self, operation):
+        """
+        Return the number of seconds to delay the given operation by.
+        """
+        latency = self.latencies.get(operation, self.latency_ms)
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(latency + jitter, 0) / 1000
+
+    def round_trip(self, collection, operation):
+        """
+        Count a round trip and wait for as long as it would take.
+        """
+        with self.lock:
+            self.counts[(collection, operation)] += 1
+        delay = self.get_delay(operation)
+        if delay > 0:
+            time.sleep(delay)
+
+    def get_count(self):
+        """
+        Return the total number of round trips made so far.
+        """
+        with self.lock:
+            return sum(self.counts.values())
+
+    def reset(self):
+        """
+        Forget the round trips made so far.
+        """
+        with self.lock:
+            self.counts.clear()
+
+
+class LatencyCollection():
+    """
+    This class generates a collection whose round trips go through a
+    LatencyBackend. Every other attribute is that of the wrapped collection.
+    """
+
+    def __init__(self, backend, name, collection):
+        """
+        Initialize a collection wrapping the given collection.
+        """
+        self.backend = backend
+        self.name = name
+        self.collection = collection
+
+    def __getattr__(self, attribute):
+        """
+        Return the wrapped collection's attribute, delaying it first if it is
+        a method making a round trip. find's round trip is charged when the
+        cursor is created rather than when it is read.
+        """
+        value = getattr(self.collection, attribute)
+        if attribute == "with_options":  # Keep delaying the new collection
+            return lambda *args, **kwargs: LatencyCollection(
+                self.backend, self.name, value(*args, **kwargs))
+        if attribute not in ROUND_TRIP_METHODS:
+            return value
+
+        def round_trip(*args, **kwargs):
+            self.backend.round_trip(self.name, attribute)
+            return value(*args, **kwargs)
+
+        return round_trip
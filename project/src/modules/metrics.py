@@ -0,0 +1,47 @@
+"""
+This file houses the Prometheus metrics of both apps. Under gunicorn, set the
+prometheus_multiproc_dir environment variable to an empty directory so that
+every worker process records into it and /metrics reports their sum.
+"""
+
+import os
+from prometheus_client import (CollectorRegistry, Counter, Histogram, REGISTRY,
+                               generate_latest, multiprocess)
+
+REQUEST_LATENCY = Histogram("bytes_request_duration_seconds",
+                            "Time spent handling requests.",
+                            ["app", "endpoint", "method"])
+
+REQUEST_COUNT = Counter("bytes_requests_total", "Requests handled.",
+                        ["app", "endpoint", "method", "status"])
+
+DB_CALL_LATENCY = Histogram("bytes_db_call_duration_seconds",
+                            "Time spent on database round trips.",
+                            ["collection", "operation"])
+
+CACHE_REQUESTS = Counter("bytes_cache_requests_total",
+                         "In-process cache lookups, by result (hit or miss).",
+                         ["cache", "result"])
+
+QR_ENCODE_LATENCY = Histogram("bytes_qr_encode_duration_seconds",
+                              "Time spent rendering QR code images.")
+
+
+def get_multiprocess_dir():
+    """
+    Return the directory worker processes record metrics into, or None if
+    metrics are kept in this process only.
+    """
+    return os.environ.get("prometheus_multiproc_dir")
+
+
+def get_metrics():
+    """
+    Return every metric in the Prometheus text format, summed over all worker
+    processes when running with several.
+    """
+    if get_multiprocess_dir() is None:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
@@ -0,0 +1,215 @@
+"""
+This file houses the data migrations that move existing documents to a new
+schema. Every migration is safe to run more than once, and while the apps are
+serving requests.
+"""
+
+from datetime import datetime
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+from modules.database import Database
+from modules.owner.public_profile import normalize_directory_field
+
+
+def get_redemption(code, restaurant_id, reward):
+    """
+    Return the redemptions document for a reward stored with an owner or
+    customer, whose code is of the form customer+reward_id+index+date.
+    """
+    parts = code.split("+")
+    redemption = {
+        "redemption_code": code,
+        "restaurant_id": restaurant_id,
+        "customer": parts[0],
+        "text": reward.get("text", ""),
+        "is_redeemed": reward.get("is_redeemed", False)
+    }
+    if len(parts) == 4:
+        try:
+            redemption["reward_id"] = ObjectId(parts[1])
+            redemption["issue_date"] = datetime.fromisoformat(parts[3])
+        except (InvalidId, ValueError):
+            pass
+    if "redemption_date" in reward:
+        redemption["redemption_date"] = reward["redemption_date"]
+    return redemption
+
+
+def migrate_redemptions(database=None, batch_size=500):
+    """
+    Move the rewards kept in owners' client_rewards and customers'
+    completed_rewards into the redemptions collection, in batches of
+    batch_size documents, then remove them from the owners and customers.
+    Rewards already in the redemptions collection are left untouched.
+    Return the number of rewards added.
+    """
+    db = database if database is not None else Database.get_instance()
+    added = 0
+
+    # customers hold the reward's owner, so they are copied first
+    sources = [("customers", "progress.completed_rewards", {
+        "username": 1,
+        "progress.restaurant_id": 1,
+        "progress.completed_rewards": 1
+    }), ("restaurant_users", "client_rewards", {
+        "client_rewards": 1
+    })]
+    for collection, field, projection in sources:
+        operations = []
+        cleanups = []
+        documents = db.find(collection, {field: {
+            "$exists": True
+        }},
+                            projection,
+                            raw=True)
+        for document in documents:
+            if collection == "customers":
+                rewards = [(progress["restaurant_id"], reward)
+                           for progress in document["progress"]
+                           for reward in progress.get("completed_rewards", [])]
+                # each restaurant's rewards are removed by position once copied
+                cleanups.append(
+                    UpdateOne({"_id": document["_id"]}, {
+                        "$unset": {
+                            "progress." + str(i) + ".completed_rewards": ""
+                            for i, progress in enumerate(document["progress"])
+                            if "completed_rewards" in progress
+                        }
+                    }))
+            else:
+                rewards = [(document["_id"], reward)
+                           for reward in document["client_rewards"]]
+            for restaurant_id, reward in rewards:
+                redemption = get_redemption(reward["redemption_code"],
+                                            restaurant_id, reward)
+                if collection == "customers":
+                    redemption["customer"] = document["username"]
+                operations.append(
+                    UpdateOne({"redemption_code": redemption["redemption_code"]},
+                              {"$setOnInsert": redemption},
+                              upsert=True))
+            if len(operations) >= batch_size:
+                added += db.bulk_write("redemptions", operations).upserted_count
+                operations = []
+                if cleanups:
+                    db.bulk_write("customers", cleanups)
+                    cleanups = []
+        if operations:
+            added += db.bulk_write("redemptions", operations).upserted_count
+        if cleanups:
+            db.bulk_write("customers", cleanups)
+
+    db.update_many("restaurant_users", {"client_rewards": {
+        "$exists": True
+    }}, {"$unset": {
+        "client_rewards": ""
+    }})
+    return added
+
+
+def migrate_progress(database=None, batch_size=500):
+    """
+    Move the progress kept in customers' progress arrays into the progress
+    collection, in batches of batch_size documents, then remove the arrays.
+    Goals are merged into any progress the customer made since, and arrays
+    still holding rewards are kept until migrate_redemptions has moved them.
+    Existing progress counts towards epoch 0, the epoch of boards that have
+    not been rotated since epochs were introduced.
+    Return the number of progress documents added.
+    """
+    db = database if database is not None else Database.get_instance()
+    added = 0
+    operations = []
+    # progress made since the deploy, before boards had epochs, so that the
+    # customers' progress is merged into it
+    db.update_many("progress", {"epoch": {
+        "$exists": False
+    }}, {"$set": {
+        "epoch": 0
+    }})
+    customers = db.find("customers", {"progress": {
+        "$exists": True
+    }}, {
+        "username": 1,
+        "progress.restaurant_id": 1,
+        "progress.completed_goals": 1
+    },
+                        raw=True)
+    for customer in customers:
+        for progress in customer["progress"]:
+            operations.append(
+                UpdateOne(
+                    {
+                        "customer": customer["username"],
+                        "restaurant_id": progress["restaurant_id"],
+                        "epoch": 0
+                    }, {
+                        "$addToSet": {
+                            "completed_goals": {
+                                "$each": progress.get("completed_goals", [])
+                            }
+                        }
+                    },
+                    upsert=True))
+        if len(operations) >= batch_size:
+            added += db.bulk_write("progress", operations).upserted_count
+            operations = []
+    if operations:
+        added += db.bulk_write("progress", operations).upserted_count
+
+    db.update_many(
+        "customers", {
+            "progress": {
+                "$exists": True,
+                "$not": {
+                    "$elemMatch": {
+                        "completed_rewards": {
+                            "$exists": True
+                        }
+                    }
+                }
+            }
+        }, {"$unset": {
+            "progress": ""
+        }})
+    return added
+
+
+def migrate_directory_fields(database=None, batch_size=500):
+    """
+    Normalize the category and city of every restaurant profile as they are
+    now saved, in batches of batch_size documents, so that directory filters
+    match profiles saved before. Return the number of profiles changed.
+    """
+    db = database if database is not None else Database.get_instance()
+    changed = 0
+    operations = []
+    owners = db.find("restaurant_users", {"profile": {
+        "$exists": True
+    }}, {
+        "profile.category": 1,
+        "profile.location.city": 1
+    })
+    for owner in owners:
+        fields = {
+            "profile.category": owner["profile"].get("category"),
+            "profile.location.city": owner["profile"].get("location",
+                                                          {}).get("city")
+        }
+        normalized = {
+            field: normalize_directory_field(value)
+            for field, value in fields.items()
+            if isinstance(value, str) and
+            normalize_directory_field(value) != value
+        }
+        if normalized:
+            operations.append(UpdateOne({"_id": owner["_id"]},
+                                        {"$set": normalized}))
+        if len(operations) >= batch_size:
+            changed += db.bulk_write("restaurant_users",
+                                     operations).modified_count
+            operations = []
+    if operations:
+        changed += db.bulk_write("restaurant_users", operations).modified_count
+    return changed
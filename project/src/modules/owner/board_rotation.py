@@ -0,0 +1,83 @@
+"""
+This file houses the board rotation scheduler. It replaces expired bingo boards
+in the background so that viewing a board never has to. Under gunicorn, where
+every worker would poll on its own, it is disabled (see gunicorn.conf.py) and
+boards are rotated by a single `flask rotate-boards --interval 60` process.
+"""
+
+import os
+import threading
+from datetime import datetime
+from pymongo.errors import PyMongoError
+from modules.database import Database, QueryFailureException
+from modules.owner.game_board import GameBoardManager
+from modules.owner.restaurant_profile_manager import RestaurantProfileManager
+
+# Seconds between rotations when running in the background, 0 disables them
+ROTATION_INTERVAL = int(os.environ.get("BYTES_BOARD_ROTATION_INTERVAL", 60))
+
+
+def rotate_expired_boards(batch_size=100):
+    """
+    Replace every expired bingo board with its future board, in batches of
+    batch_size restaurant users. Return the number of boards rotated, leaving
+    out boards rotated elsewhere meanwhile.
+    """
+    db = Database.get_instance()
+    gbm = GameBoardManager(RestaurantProfileManager(""))
+    now = datetime.now()
+    rotated = 0
+    last_id = None
+    while True:
+        query = {"bingo_board.expiry_date": {"$lte": now}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        try:
+            expired = db.query("restaurant_users",
+                               query, {"_id": 1},
+                               sort=[("_id", 1)],
+                               limit=batch_size)
+        except QueryFailureException:
+            print("Something's wrong with the query.")
+            break
+        for owner in expired:
+            rotated += gbm.update_board(owner["_id"])
+        if len(expired) < batch_size:
+            break
+        last_id = expired[-1]["_id"]
+    return rotated
+
+
+class BoardRotationScheduler(threading.Thread):
+    """
+    This class generates a background thread that rotates expired bingo boards
+    for the given app every interval seconds until it is stopped.
+    """
+
+    def __init__(self, app, interval=ROTATION_INTERVAL):
+        """
+        Initialize a daemon scheduler for the given Flask app.
+        """
+        threading.Thread.__init__(self, name="board-rotation", daemon=True)
+        self.app = app
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        """
+        Rotate expired boards until stopped. Each pass runs in its own app
+        context so that no documents are kept between passes.
+        """
+        while not self.stopped.is_set():
+            try:
+                with self.app.app_context():
+                    rotate_expired_boards()
+            except PyMongoError as error:  # Retry on the next pass
+                print(error)
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        """
+        Stop the scheduler after its current pass.
+        """
+        self.stopped.set()
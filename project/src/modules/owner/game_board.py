@@ -4,13 +4,42 @@ It is used to interact with a restaurant profile's game boards.
 """
 
 import copy
+from collections import ChainMap
 from datetime import datetime, timedelta
 from bson.objectid import ObjectId
 from bson.errors import InvalidId
-from modules.database import Database, QueryFailureException, UpdateFailureException
+from modules.database import QueryFailureException, UpdateFailureException
 from modules.owner.goals import GoalsManager
 from modules.owner.rewards import RewardsManager
-from modules.owner.restaurant_profile_manager import RestaurantProfileManager
+
+# Owner fields needed to resolve a bingo board into goal and reward text
+BOARD_PROJECTION = {"bingo_board": 1, "goals": 1, "rewards": 1}
+
+
+def index_by_id(items):
+    """
+    Return a dictionary of the given goals or rewards keyed by their _id.
+    """
+    return {item["_id"]: item for item in items}
+
+
+def get_board_epoch(board):
+    """
+    Return the epoch of the given bingo board, which counts how many times it
+    has been rotated. Boards from before epochs were introduced are epoch 0.
+    """
+    return board.get("epoch", 0)
+
+
+def resolve_board_items(ids, catalog):
+    """
+    Return the catalog entries (goals or rewards) matching the given list of
+    ids, in order, where catalog maps _id to entry. Each lookup is O(1), so
+    the cost depends on the board size only. Each returned entry is a view:
+    reads fall through to the catalog entry while writes (i.e "is_complete")
+    stay on the view, leaving the catalog untouched.
+    """
+    return [ChainMap({}, catalog[index]) for index in ids if index in catalog]
 
 
 class GameBoardManager():
@@ -25,32 +54,35 @@ class GameBoardManager():
         """
         self.rpm = restaurant_profile_manager
 
+    def resolve_board(self, owner):
+        """
+        Return the bingo board of the given restaurant user document, fetched
+        using BOARD_PROJECTION. The board will include text info for goals and
+        rewards. Throws KeyError if the user has no board.
+        """
+        board = owner["bingo_board"]
+        # Custom items take precedence over the cached shared catalogs, whose
+        # indexes are reused rather than rebuilt
+        goals = ChainMap(index_by_id(owner.get("goals", [])),
+                         GoalsManager(self.rpm).get_shared_goals_index())
+        rewards = ChainMap(index_by_id(owner.get("rewards", [])),
+                           RewardsManager(self.rpm).get_shared_rewards_index())
+
+        board["board"] = resolve_board_items(board["board"], goals)
+        board["board_reward"] = resolve_board_items(board["board_reward"],
+                                                    rewards)
+        return board
+
     def get_bingo_board(self):
         """
         Return the current restaurant user's bingo board. The board will include
         text info for goals and rewards.
         """
         try:
-            goals = GoalsManager(self.rpm).get_goals()
-            rewards = RewardsManager(self.rpm).get_rewards()
-            board = self.rpm.db.query(
-                "restaurant_users",
-                {"username": self.rpm.get_id()})[0]["bingo_board"]
-
-            board["board"] = [
-                copy.deepcopy(goal)
-                for index in board["board"]
-                for goal in goals
-                if index == goal["_id"]
-            ]
-
-            board["board_reward"] = [
-                copy.deepcopy(reward)
-                for index in board["board_reward"]
-                for reward in rewards
-                if index == reward["_id"]
-            ]
-            return board
+            owner = self.rpm.db.query("restaurant_users",
+                                      {"username": self.rpm.get_id()},
+                                      BOARD_PROJECTION)[0]
+            return self.resolve_board(owner)
         except (QueryFailureException, IndexError, KeyError):
             print("Something's wrong with the query.")
             return {
@@ -67,16 +99,22 @@ class GameBoardManager():
         text info for goals and rewards.
         """
         try:
-            restaurant = self.rpm.db.query("restaurant_users",
-                                           {"_id": ObjectId(rest_id)})[0]
-            temp_rpm = self.rpm
-            self.rpm = RestaurantProfileManager(restaurant["username"])
-            board = self.get_bingo_board()
-            self.rpm = temp_rpm
-            return board
-        except (QueryFailureException, IndexError):
+            owner = self.rpm.db.query("restaurant_users",
+                                      {"_id": ObjectId(rest_id)},
+                                      BOARD_PROJECTION)[0]
+        except (QueryFailureException, IndexError, InvalidId):
             print("Something's wrong with the query.")
             return {}
+        try:
+            return self.resolve_board(owner)
+        except KeyError:  # No board has been created
+            return {
+                "name": "",
+                "board": [],
+                "board_reward": [],
+                "expiry_date": None,
+                "size": 4
+            }
 
     def set_bingo_board(self, bingo_board):
         """
@@ -92,10 +130,12 @@ class GameBoardManager():
                                                       23, 59, 59)
 
             # convert ids to object ids
-            bingo_board["board"] = Database.replace_object_id(
-                bingo_board["board"])
-            bingo_board["board_reward"] = Database.replace_object_id(
-                bingo_board["board_reward"])
+            bingo_board["board"] = [
+                ObjectId(goal_id) for goal_id in bingo_board["board"]
+            ]
+            bingo_board["board_reward"] = [
+                ObjectId(reward_id) for reward_id in bingo_board["board_reward"]
+            ]
 
             # if new user, update current board as well as future board
             boards = {"future_board": bingo_board}
@@ -107,63 +147,65 @@ class GameBoardManager():
             self.rpm.db.update('restaurant_users',
                                {"username": self.rpm.get_id()},
                                {'$set': boards})
-        except (UpdateFailureException, KeyError):
+        except (UpdateFailureException, KeyError, InvalidId):
             print("There was an issue updating a bingo board.")
 
     def update_board(self, obj_id):
         """
-        Checks all public restaurant user's bingo boards and replaces expired
-        boards with future game boards. If no future board exists, expiration
-        date is increased by 90 days.
+        Replaces the restaurant user's expired bingo board with their future
+        game board. If no future board exists, expiration date is increased
+        by 90 days. Either way the board's epoch is incremented, so goals
+        completed on the expired board no longer count towards it; they are
+        kept in the customers' progress for earlier epochs. The replacement
+        only applies if the board is still the one that was read, so
+        concurrent rotations of a board happen once. Return True if the board
+        was rotated by this call.
         """
         try:
-            user = self.rpm.db.query('restaurant_users', {'_id': obj_id})
+            user = self.rpm.db.query('restaurant_users', {'_id': obj_id}, {
+                'bingo_board': 1,
+                'future_board': 1
+            })[0]
             reset = 90  # expiration date deafault is set to 90 days
-            if 'expiry_date' in user[0]['bingo_board']:
-                if datetime.now() >= user[0]['bingo_board'][
-                        'expiry_date']:  # expired current board
-                    if 'future_board' in user[0]:
-                        future_exp = user[0]['future_board']['expiry_date']
-                        if future_exp <= datetime.now():  # expired future goal
-                            future_exp = datetime.now() + timedelta(days=reset)
-                        user[0]['future_board'][
-                            'expiry_date'] = future_exp  # updates future exp date
-                        self.rpm.db.update(  # updates current board in db
-                            'restaurant_users',
-                            {'username': user[0]['username']},
-                            {'$set': {
-                                'bingo_board': user[0]['future_board']
-                            }})
-                        user[0]['future_board'][  # updates future board in db
-                            'expiry_date'] = future_exp + timedelta(days=reset)
-                        self.rpm.db.update(
-                            'restaurant_users',
-                            {'username': user[0]['username']},
-                            {'$set': {
-                                'future_board': user[0]['future_board']
-                            }})
-                    customers = self.rpm.db.query('customers')
-                    for customer in customers:
-                        if 'progress' in customer:
-                            for item in customer['progress']:
-                                # checks for completed goals corresponding to expired board
-                                if item['restaurant_id'] == ObjectId(
-                                        obj_id) and 'completed_goals' in item:
-                                    # removes current goals in customer profiles
-                                    self.rpm.db.update(
-                                        'customers', {
-                                            "username": customer['username'],
-                                            "progress.restaurant_id": obj_id
-                                        }, {
-                                            "$set": {
-                                                "progress.$.completed_goals": [
-                                                ]
-                                            }
-                                        })
+            expiry = user['bingo_board']['expiry_date']
+            if datetime.now() < expiry:  # current board has not expired
+                return False
+            epoch = get_board_epoch(user['bingo_board']) + 1
+            if 'future_board' in user:
+                future_exp = user['future_board']['expiry_date']
+                if future_exp <= datetime.now():  # expired future goal
+                    future_exp = datetime.now() + timedelta(days=reset)
+                # future board becomes current, and is kept as the future
+                # board with a later expiry date
+                boards = {
+                    'bingo_board':
+                        dict(user['future_board'],
+                             expiry_date=future_exp,
+                             epoch=epoch),
+                    'future_board':
+                        dict(user['future_board'],
+                             expiry_date=future_exp + timedelta(days=reset))
+                }
+            else:
+                boards = {
+                    'bingo_board.expiry_date':
+                        datetime.now() + timedelta(days=reset),
+                    'bingo_board.epoch':
+                        epoch
+                }
+            res = self.rpm.db.update('restaurant_users', {
+                '_id': obj_id,
+                'bingo_board.expiry_date': expiry
+            }, {'$set': boards})
+            # not matched if already rotated elsewhere
+            return res.matched_count == 1
         except UpdateFailureException:
             print("There was an issue updating")
+        except (QueryFailureException, IndexError):
+            print("Something's wrong with the query.")
         except KeyError:
             print("No current board")
+        return False
 
     def get_future_board(self):
         """
@@ -171,7 +213,8 @@ class GameBoardManager():
         """
         try:
             profile = self.rpm.db.query('restaurant_users',
-                                        {"username": self.rpm.get_id()})
+                                        {"username": self.rpm.get_id()},
+                                        {"future_board": 1})
             return profile[0]["future_board"]
         except KeyError:  # New User, no future board found
             return {
@@ -197,7 +240,8 @@ class GameBoardManager():
         """
         try:
             profile = self.rpm.db.query('restaurant_users',
-                                        {"username": self.rpm.get_id()})
+                                        {"username": self.rpm.get_id()},
+                                        {"bingo_board.expiry_date": 1})
             return profile[0]["bingo_board"]["expiry_date"]
         except (QueryFailureException, IndexError, KeyError, InvalidId):
             return None
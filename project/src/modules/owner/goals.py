@@ -5,6 +5,10 @@ restaurant users.
 """
 from bson.objectid import ObjectId
 from modules.database import QueryFailureException, UpdateFailureException
+from modules.cache import TTLCache, CATALOG_TTL
+
+# Holds the shared goals, along with an index of them by _id
+SHARED_GOALS_CACHE = TTLCache(CATALOG_TTL, name="shared_goals")
 
 
 class GoalsManager:
@@ -13,31 +17,62 @@ class GoalsManager:
     database and also manipulating custom goals for restaurant users.
     """
 
+    @staticmethod
+    def invalidate_shared_goals():
+        """
+        Discard this process's cached copy of the shared goals, so that they
+        are re-read on next use.
+        """
+        SHARED_GOALS_CACHE.invalidate()
+
     def __init__(self, restaurant_profile_manager):
         """
         Initialize a goals manager using the provided restaurant profile manager.
         """
         self.rpm = restaurant_profile_manager
 
+    def load_shared_goals(self):
+        """
+        Return the shared goals and an index of them by _id, reading them
+        from the database only if they are not cached.
+        """
+        cached = SHARED_GOALS_CACHE.get("goals")
+        if cached is None:
+            goals = self.rpm.db.query('goals')
+            cached = (goals, {goal["_id"]: goal for goal in goals})
+            SHARED_GOALS_CACHE.set("goals", cached)
+        return cached
+
     def get_shared_goals(self):
         """
         Return a list of all goals that are shared among all restaurant
         profiles. This includes the curated list of goals created by the
-        Bytes team.
+        Bytes team. The list is cached for CATALOG_TTL seconds.
         """
         try:
-            return self.rpm.db.query('goals')
+            return list(self.load_shared_goals()[0])
         except QueryFailureException:
             print("There was an issue retrieving goals.")
             return []
 
+    def get_shared_goals_index(self):
+        """
+        Return a dictionary of the shared goals keyed by _id.
+        """
+        try:
+            return self.load_shared_goals()[1]
+        except QueryFailureException:
+            print("There was an issue retrieving goals.")
+            return {}
+
     def get_custom_goals(self):
         """
         Gets custom goals added by the user.
         """
         try:
             user = self.rpm.db.query('restaurant_users',
-                                     {"username": self.rpm.get_id()})[0]
+                                     {"username": self.rpm.get_id()},
+                                     {"goals": 1})[0]
             return user["goals"]
         except KeyError:  # New User, no goals found
             return []
@@ -85,7 +120,11 @@ class GoalsManager:
         and throws an exception.
         """
         try:
-            user = self.rpm.db.query("restaurant_users", {"username": self.rpm.get_id()})[0]
+            user = self.rpm.db.query("restaurant_users",
+                                     {"username": self.rpm.get_id()}, {
+                                         "bingo_board.board": 1,
+                                         "future_board.board": 1
+                                     })[0]
             goals = user["bingo_board"]["board"] if 'bingo_board' in user else []
             future_goals = user["future_board"]["board"] if 'future_board' in user else []
             if ObjectId(goal_id) in goals:
@@ -2,8 +2,30 @@
 This file houses the restaurant profile's public profile modifier.
 It is used to interact with a restaurant owner's restaurant information.
 """
+import string
 from bson.objectid import ObjectId
+from bson.errors import InvalidId
 from modules.database import QueryFailureException, UpdateFailureException
+from modules.owner.restaurant_profile_manager import RestaurantProfileManager
+
+# Number of restaurants shown per page of the directory
+DIRECTORY_PAGE_SIZE = 24
+
+# Profile fields shown on a restaurant's card in the directory
+CARD_PROJECTION = {
+    "profile.name": 1,
+    "profile.category": 1,
+    "profile.image": 1
+}
+
+
+def normalize_directory_field(value):
+    """
+    Return a category or city as it is stored and filtered by in the
+    directory, so that filters match however they are typed (i.e "new  york"
+    is "New York").
+    """
+    return string.capwords(value) if value else value
 
 
 class PublicProfileModifier():
@@ -25,7 +47,8 @@ class PublicProfileModifier():
         """
         try:
             user = self.rpm.db.query('restaurant_users',
-                                     {"username": self.rpm.get_id()})[0]
+                                     {"username": self.rpm.get_id()},
+                                     {"profile": 1})[0]
             return user["profile"]
         except KeyError:  # New User, no profile found
             return {}
@@ -38,22 +61,33 @@ class PublicProfileModifier():
         Update the restaurant user's profile using the data provided in profile.
         """
         profile['is_public'] = 'is_public' in profile
+        if "category" in profile:
+            profile["category"] = normalize_directory_field(profile["category"])
+        if "city" in profile.get("location", {}):
+            profile["location"]["city"] = normalize_directory_field(
+                profile["location"]["city"])
         try:
             self.rpm.db.update('restaurant_users',
                                {"username": self.rpm.get_id()},
                                {'$set': {
                                    "profile": profile
                                }})
+            RestaurantProfileManager.invalidate_restaurant_name(
+                self.rpm.get_restaurant_id())
         except UpdateFailureException:
             print("There was an issue updating a profile.")
 
-    def get_public_users(self):
+    def get_public_users(self, projection=None, stream=False):
+        """
+        Get all restaurant users that have a public profile. If a projection
+        is given, only the fields it names are fetched. If stream is set, the
+        users are fetched as they are read rather than listed up front.
         """
-            Get all restaurant users that have a public profile.
-            """
         try:
             restaurant_owners = self.rpm.db.query('restaurant_users',
-                                                  {'profile.is_public': True})
+                                                  {'profile.is_public': True},
+                                                  projection,
+                                                  stream=stream)
             return restaurant_owners
         except QueryFailureException:
             print("Something's wrong with the query.")
@@ -63,8 +97,75 @@ class PublicProfileModifier():
         """
         Get all restaurant profiles that are set to public.
         """
-        users = self.get_public_users()
-        return {owner["_id"]: owner["profile"] for owner in users}
+        try:
+            users = self.get_public_users({"profile": 1}, stream=True)
+            return {owner["_id"]: owner["profile"] for owner in users}
+        except QueryFailureException:
+            print("Something's wrong with the query.")
+            return {}
+
+    def get_directory_page(self,
+                           category=None,
+                           city=None,
+                           after=None,
+                           limit=DIRECTORY_PAGE_SIZE):
+        """
+        Return a page of the public restaurant directory as a tuple of
+        ({restaurant id: card profile}, cursor of the next page). Restaurants
+        are ordered by id and may be filtered by category and city, in any
+        case. after is
+        the cursor returned with the previous page; the next cursor is None on
+        the last page. Each page is a single indexed query, however many
+        restaurants there are, streamed into the page as it is fetched.
+        """
+        query = {"profile.is_public": True}
+        if category:
+            query["profile.category"] = normalize_directory_field(category)
+        if city:
+            query["profile.location.city"] = normalize_directory_field(city)
+        try:
+            if after:
+                query["_id"] = {"$gt": ObjectId(after)}
+            # one extra restaurant tells whether there is a next page
+            owners = self.rpm.db.query('restaurant_users',
+                                       query,
+                                       CARD_PROJECTION,
+                                       sort=[("_id", 1)],
+                                       limit=limit + 1,
+                                       stream=True)
+            profiles = {}
+            cursor = None
+            for owner in owners:
+                if len(profiles) == limit:
+                    cursor = str(list(profiles)[-1])
+                    break
+                profiles[owner["_id"]] = owner["profile"]
+        except (QueryFailureException, InvalidId, TypeError):
+            print("Something's wrong with the query.")
+            return ({}, None)
+        return (profiles, cursor)
+
+    def get_public_profiles_by_ids(self, rest_ids):
+        """
+        Return the card profiles of the public restaurants among the given
+        restaurant ids as {restaurant id: card profile}, in the given order.
+        Costs a single indexed query, streamed as it is fetched.
+        """
+        try:
+            query = {"_id": {"$in": list(rest_ids)}, "profile.is_public": True}
+            owners = self.rpm.db.query('restaurant_users',
+                                       query,
+                                       CARD_PROJECTION,
+                                       stream=True)
+            profiles = {owner["_id"]: owner["profile"] for owner in owners}
+        except QueryFailureException:
+            print("Something's wrong with the query.")
+            return {}
+        return {
+            rest_id: profiles[rest_id]
+            for rest_id in rest_ids
+            if rest_id in profiles
+        }
 
     def get_restaurant_profile_by_id(self, rest_id):
         """
@@ -72,7 +173,8 @@ class PublicProfileModifier():
         """
         try:
             restaurant = self.rpm.db.query("restaurant_users",
-                                           {"_id": ObjectId(rest_id)})[0]
+                                           {"_id": ObjectId(rest_id)},
+                                           {"profile": 1})[0]
             return restaurant["profile"]
         except (QueryFailureException, IndexError, KeyError):
             print("There was an issue retrieving the profile.")
@@ -7,6 +7,10 @@ from bson.objectid import ObjectId
 from bson.errors import InvalidId
 from modules.profile_manager import ProfileManager
 from modules.database import Database, QueryFailureException
+from modules.cache import TTLCache, NAME_TTL
+
+# Maps restaurant user ids to their restaurant's name
+RESTAURANT_NAME_CACHE = TTLCache(NAME_TTL, maxsize=10000, name="restaurant_names")
 
 
 class RestaurantProfileManager(ProfileManager):
@@ -16,6 +20,34 @@ class RestaurantProfileManager(ProfileManager):
     creation/load operations.
     """
 
+    @staticmethod
+    def get_restaurant_names_by_ids(object_ids):
+        """
+        Given a list of restaurant user database ids, return a dictionary
+        mapping each id to its restaurant's name. Names are cached, and any
+        that are not are fetched together in a single query. Ids without a
+        restaurant name are left out.
+        """
+        names = {}
+        missing = []
+        for object_id in {ObjectId(object_id) for object_id in object_ids}:
+            name = RESTAURANT_NAME_CACHE.get(object_id)
+            if name is None:
+                missing.append(object_id)
+            else:
+                names[object_id] = name
+        if missing:
+            db = Database.get_instance()
+            users = db.query("restaurant_users", {"_id": {
+                "$in": missing
+            }}, {"profile.name": 1})
+            for user in users:
+                if "name" in user.get("profile", {}):
+                    names[user["_id"]] = user["profile"]["name"]
+                    RESTAURANT_NAME_CACHE.set(user["_id"],
+                                              user["profile"]["name"])
+        return names
+
     @staticmethod
     def get_restaurant_name_by_id(object_id):
         """
@@ -23,13 +55,20 @@ class RestaurantProfileManager(ProfileManager):
         Returns "" on failure.
         """
         try:
-            db = Database.get_instance()
-            user = db.query("restaurant_users", {"_id": ObjectId(object_id)})[0]
-            return user["profile"]["name"]
-        except (QueryFailureException, IndexError, KeyError, InvalidId):
+            names = RestaurantProfileManager.get_restaurant_names_by_ids(
+                [object_id])
+            return names[ObjectId(object_id)]
+        except (QueryFailureException, KeyError, InvalidId):
             print("Something's wrong with the query.")
             return ""
 
+    @staticmethod
+    def invalidate_restaurant_name(object_id):
+        """
+        Discard this process's cached name of the given restaurant user.
+        """
+        RESTAURANT_NAME_CACHE.invalidate(ObjectId(object_id))
+
     def __init__(self, username):
         """
         Initialize a restaurant user profile using the username.
@@ -41,7 +80,8 @@ class RestaurantProfileManager(ProfileManager):
         Return the restaurant ID of a restaurant user.
         """
         try:
-            user = self.db.query('restaurant_users', {"username": self.id})[0]
+            user = self.db.query('restaurant_users', {"username": self.id},
+                                 {"_id": 1})[0]
             return user["_id"]
         except QueryFailureException:
             print("Something is wrong with the query")
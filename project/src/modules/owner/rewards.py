@@ -5,6 +5,10 @@ restaurant users.
 """
 from bson.objectid import ObjectId
 from modules.database import QueryFailureException, UpdateFailureException
+from modules.cache import TTLCache, CATALOG_TTL
+
+# Holds the shared rewards, along with an index of them by _id
+SHARED_REWARDS_CACHE = TTLCache(CATALOG_TTL, name="shared_rewards")
 
 
 class RewardsManager():
@@ -13,31 +17,62 @@ class RewardsManager():
     database and also manipulating custom rewards for restaurant users.
     """
 
+    @staticmethod
+    def invalidate_shared_rewards():
+        """
+        Discard this process's cached copy of the shared rewards, so that they
+        are re-read on next use.
+        """
+        SHARED_REWARDS_CACHE.invalidate()
+
     def __init__(self, restaurant_profile_manager):
         """
         Initialize a rewards manager using the provided restaurant profile manager.
         """
         self.rpm = restaurant_profile_manager
 
+    def load_shared_rewards(self):
+        """
+        Return the shared rewards and an index of them by _id, reading them
+        from the database only if they are not cached.
+        """
+        cached = SHARED_REWARDS_CACHE.get("rewards")
+        if cached is None:
+            rewards = self.rpm.db.query('rewards')
+            cached = (rewards, {reward["_id"]: reward for reward in rewards})
+            SHARED_REWARDS_CACHE.set("rewards", cached)
+        return cached
+
     def get_shared_rewards(self):
         """
         Return a list of all rewards that are shared among all restaurant
         profiles. This includes the curated list of goals created by the
-        Bytes team.
+        Bytes team. The list is cached for CATALOG_TTL seconds.
         """
         try:
-            return self.rpm.db.query('rewards')
+            return list(self.load_shared_rewards()[0])
         except QueryFailureException:
             print("There was an issue retrieving rewards.")
             return []
 
+    def get_shared_rewards_index(self):
+        """
+        Return a dictionary of the shared rewards keyed by _id.
+        """
+        try:
+            return self.load_shared_rewards()[1]
+        except QueryFailureException:
+            print("There was an issue retrieving rewards.")
+            return {}
+
     def get_custom_rewards(self):
         """
         Gets custom rewards added by the user.
         """
         try:
             user = self.rpm.db.query('restaurant_users',
-                                     {"username": self.rpm.get_id()})[0]
+                                     {"username": self.rpm.get_id()},
+                                     {"rewards": 1})[0]
             return user["rewards"]
         except KeyError:  # New User, no rewards found
             return []
@@ -93,7 +128,11 @@ class RewardsManager():
         and throws an exception.
         """
         try:
-            user = self.rpm.db.query("restaurant_users", {"username": self.rpm.get_id()})[0]
+            user = self.rpm.db.query("restaurant_users",
+                                     {"username": self.rpm.get_id()}, {
+                                         "bingo_board.board_reward": 1,
+                                         "future_board.board_reward": 1
+                                     })[0]
             rewards = user["bingo_board"]["board_reward"] if 'bingo_board' in user else []
             future_rewards = user["future_board"]["board_reward"] if 'future_board' in user else []
             if ObjectId(reward_id) in rewards:
@@ -4,11 +4,14 @@ It is used to interact with goal completion and reward redemption information in
 database.
 """
 
+from collections import ChainMap
 from datetime import datetime
 from bson.objectid import ObjectId
-from modules.database import QueryFailureException, UpdateFailureException
+from modules.database import (QueryFailureException, UpdateFailureException,
+                              InsertFailureException)
+from modules import bingo
 from modules.owner.rewards import RewardsManager
-from modules.owner.game_board import GameBoardManager
+from modules.owner.game_board import index_by_id, get_board_epoch
 
 
 class Validator():
@@ -23,269 +26,133 @@ class Validator():
         """
         self.rpm = restaurant_profile_manager
 
-    def add_reward_code(self, customer, reward_index):
+    def add_reward_code(self, customer, reward_index, owner):
         """
-        Adds a reward code to the databases if there is a bingo on the board
+        Adds a reward code to the database if there is a bingo on the board,
+        given the owner's document with their bingo board and custom rewards
         """
-        owner = self.rpm.db.query('restaurant_users',
-                                  {"username": self.rpm.get_id()})[0]
         reward_id = owner["bingo_board"]["board_reward"][reward_index]
-        rewards = RewardsManager(self.rpm).get_rewards()
-        text = ""
-        for reward in rewards:
-            if str(reward["_id"]) == str(reward_id):
-                text = reward["reward"]
+        rewards = ChainMap(index_by_id(owner.get("rewards", [])),
+                           RewardsManager(self.rpm).get_shared_rewards_index())
+        text = rewards[reward_id]["reward"] if reward_id in rewards else ""
         code = str(customer) + "+" + str(reward_id) + "+" + str(
             reward_index) + "+" + str(datetime.now())
         try:
-            if "client_rewards" not in owner:
-                self.rpm.db.update('restaurant_users',
-                                   {"username": self.rpm.get_id()}, {
-                                       "$set": {
-                                           "client_rewards": [{
-                                               "redemption_code": code,
-                                               "text": text,
-                                               "is_redeemed": False
-                                           }]
-                                       }
-                                   })
-            else:
-                self.rpm.db.update('restaurant_users',
-                                   {"username": self.rpm.get_id()}, {
-                                       "$push": {
-                                           "client_rewards": {
-                                               "redemption_code": code,
-                                               "text": text,
-                                               "is_redeemed": False
-                                           }
-                                       }
-                                   })
-            self.rpm.db.update(
-                'customers', {
-                    "username": customer,
-                    "progress.restaurant_id": ObjectId(str(owner["_id"]))
-                }, {
-                    "$push": {
-                        "progress.$.completed_rewards": {
-                            "redemption_code": code,
-                            "text": text,
-                            "is_redeemed": False
-                        }
-                    }
+            self.rpm.db.insert(
+                'redemptions', {
+                    "redemption_code": code,
+                    "restaurant_id": owner["_id"],
+                    "customer": customer,
+                    "reward_id": reward_id,
+                    "text": text,
+                    "is_redeemed": False,
+                    "issue_date": datetime.now()
                 })
-        except UpdateFailureException:
-            print("There was an issue updating")
-
-    def check_row(self, position, size, customer, goals):
-        """
-        Checks if there is a bingo on the rows
-        """
-        start = int(position)
-        counter = 0
-        while (start % size) != 0:
-            start = start - 1
-        for i in range(start, start + size):
-            for goal in goals:
-                if i == int(goal["position"]):
-                    counter = counter + 1
-        if counter == size:
-            self.add_reward_code(customer, int(int(position) / size) + 1)
-
-    def check_col(self, position, size, customer, goals):
-        """
-        Checks if there is a bingo on the columns
-        """
-        start = int(position) % size
-        counter = 0
-        for i in range(start, size * size, size):
-            for goal in goals:
-                if i == int(goal["position"]):
-                    counter = counter + 1
-        if counter == size:
-            self.add_reward_code(customer, start + size + 1)
+        except InsertFailureException:
+            print("There was an issue inserting")
 
-    def check_diagonal(self, position, size, customer, goals):
+    def award_bingos(self, position, customer, goals, owner):
         """
-        Checks if there is a bingo on the diagonals
+        Adds a reward code for every bingo completed by the goal at position,
+        given the customer's completed goals at this restaurant
         """
-        left = False
-        right = False
-        counter = 0
-        start = int(position)
-        while start >= 0:
-            if start == 0:
-                left = True
-            start = start - (size + 1)
-
-        start = int(position)
-        while start >= (size - 1):
-            if start == (size - 1):
-                right = True
-            start = start - (size - 1)
-
-        if left:
-            for i in range(0, size * size, size + 1):
-                for goal in goals:
-                    if i == int(goal["position"]):
-                        counter = counter + 1
-            if counter == size:
-                self.add_reward_code(customer, size + size + 1)
-        counter = 0
-        if right:
-            for i in range(size - 1, (size * size - (size - 1)), size - 1):
-                for goal in goals:
-                    if i == int(goal["position"]):
-                        counter = counter + 1
-                i = i + size - 1
-            if counter == size:
-                self.add_reward_code(customer, 0)
+        mask = bingo.get_cells_mask(goal["position"] for goal in goals)
+        size = owner["bingo_board"]["size"]
+        for line in bingo.get_new_lines(mask, position, size):
+            self.add_reward_code(customer, line, owner)
 
     def complete_goal(self, user, goal_id, position):
         """
         Adds a goal to the database that has been completed by the customer and returns
-        a message depending on if it is successful or not.
+        a message depending on if it is successful or not. The goal is only added if
+        it has not been completed yet, as a single atomic update, so concurrent scans
+        of the same code complete it once.
         """
         try:
-            owner_id = self.rpm.db.query(
-                'restaurant_users', {"username": self.rpm.get_id()})[0]["_id"]
-            size = self.rpm.db.query(
-                'restaurant_users',
-                {"username": self.rpm.get_id()})[0]["bingo_board"]["size"]
-            user_profile = self.rpm.db.query('customers', {"username": user})[0]
-            goals = []
-            id_exists = False
-            if "progress" in user_profile:
-                for restaurant in user_profile["progress"]:
-                    if restaurant["restaurant_id"] == owner_id:
-                        goals = restaurant["completed_goals"]
-                        for goal in goals:
-                            if str(goal["_id"]
-                                  ) == goal_id and position == goal["position"]:
-                                return "This goal has already been completed!"
-                        id_exists = True
-
-            
+            owner = self.rpm.db.query('restaurant_users',
+                                      {"username": self.rpm.get_id()}, {
+                                          "bingo_board": 1,
+                                          "rewards": 1
+                                      })[0]
+            board = owner["bingo_board"]["board"]
+            if not position.isdigit() or not 1 <= len(position) <= 2 or \
+                    not int(position) < len(board) or \
+                    not str(board[int(position)]) == goal_id:
+                return "Invalid QR code!"
 
-            gbm = GameBoardManager(self.rpm)
-            if not isinstance(int(position), int) or \
-                    not (1 <= len(position) <= 2) or not (0 <= int(position) <= 24) or \
-                    not str(gbm.get_bingo_board()["board"][int(position)]['_id']) == goal_id:
+            if self.rpm.db.query('customers', {"username": user},
+                                 {"_id": 1}) == []:
                 return "Invalid QR code!"
-            try:
-                if "progress" in user_profile and id_exists:
-                    self.rpm.db.update(
-                        'customers', {
-                            "username": user,
-                            "progress.restaurant_id": ObjectId(owner_id)
-                        }, {
-                            "$push": {
-                                "progress.$.completed_goals": {
-                                    "_id": ObjectId(goal_id),
-                                    "position": position,
-                                    "date_completed": datetime.now()
-                                }
-                            }
-                        })
-                else:
-                    self.rpm.db.update('customers', {"username": user}, {
-                        "$push": {
-                            "progress": {
-                                "restaurant_id": ObjectId(owner_id),
-                                "completed_goals": [{
-                                    "_id": ObjectId(goal_id),
-                                    "position": position,
-                                    "date": datetime.now()
-                                }],
-                                "completed_rewards": []
+
+            # add to the customer's progress on the current board, creating
+            # it if needed, unless the goal is already in it. If a concurrent
+            # scan creates it first, the goal is added to theirs instead
+            epoch = get_board_epoch(owner["bingo_board"])
+            progress = self.rpm.db.find_one_and_update(
+                'progress', {
+                    "customer": user,
+                    "restaurant_id": owner["_id"],
+                    "epoch": epoch,
+                    "completed_goals": {
+                        "$not": {
+                            "$elemMatch": {
+                                "_id": ObjectId(goal_id),
+                                "position": position
                             }
                         }
-                    })
-                user_profile = self.rpm.db.query('customers',
-                                                 {"username": user})[0]
-                for restaurant in user_profile["progress"]:
-                    if restaurant["restaurant_id"] == owner_id:
-                        goals = restaurant["completed_goals"]
-                self.check_col(position, size, user, goals)
-                self.check_diagonal(position, size, user, goals)
-                self.check_row(position, size, user, goals)
-                return "Successfully marked as completed!"
-            except UpdateFailureException:
-                print("There was an issue updating")
-                return "Error"
-        except QueryFailureException:
+                    }
+                }, {
+                    "$push": {
+                        "completed_goals": {
+                            "_id": ObjectId(goal_id),
+                            "position": position,
+                            "epoch": epoch,
+                            "date_completed": datetime.now()
+                        }
+                    }
+                }, {"completed_goals": 1},
+                upsert=True)
+            if progress is None:
+                return "This goal has already been completed!"
+
+            goals = progress["completed_goals"]
+            self.award_bingos(position, user, goals, owner)
+            return "Successfully marked as completed!"
+        except UpdateFailureException:
+            print("There was an issue updating")
+            return "Error"
+        except (QueryFailureException, IndexError, KeyError):
             print("Something is wrong with the query")
             return "Error"
-        return "Error"
 
     def complete_reward(self, user, code):
         """
-        Adds a reward to the database that has been completed by the customer and returns
-        a message depending on if it is successful or not.
+        Marks a reward issued to the customer by this restaurant as redeemed and returns
+        a message depending on if it is successful or not. The reward is only marked if
+        it has not been redeemed yet, as a single atomic update.
         """
         try:
-            owner = self.rpm.db.query('restaurant_users',
-                                      {"username": self.rpm.get_id()})[0]
-            user_profile = self.rpm.db.query('customers', {"username": user})[0]
-            in_user = False
-            counter = -1
-            if "progress" in user_profile:
-                for restaurant in user_profile["progress"]:
-                    counter += 1
-                    if restaurant["restaurant_id"] == owner["_id"]:
-                        restaurant_index = counter
-                        rewards = restaurant['completed_rewards']
-                        counter = -1
-                        for reward in rewards:
-                            counter += 1
-                            if reward["redemption_code"] == code:
-                                text = reward["text"]
-                                in_user = True
-                                customer_index = counter
-                                if "redemption_date" in reward:
-                                    return "Code has already been redeemed!"
-                if not in_user:
-                    return "Invalid QR code!"
-            counter = -1
-            for reward in owner["client_rewards"]:
-                counter += 1
-                if reward["redemption_code"] == code:
-                    owner_index = counter
-
-            self.rpm.db.update(
-                'restaurant_users', {
-                    "username": self.rpm.get_id(),
-                    "client_rewards.redemption_code": code
-                }, {
+            owner_id = self.rpm.get_restaurant_id()
+            redemption = {
+                "redemption_code": code,
+                "restaurant_id": owner_id,
+                "customer": user
+            }
+            redeemed = self.rpm.db.find_one_and_update(
+                'redemptions', dict(redemption, is_redeemed=False), {
                     "$set": {
-                        "client_rewards." + str(owner_index): {
-                            "redemption_code": code,
-                            "text": text,
-                            "is_redeemed": True,
-                            "redemption_date": datetime.now()
-                        }
+                        "is_redeemed": True,
+                        "redemption_date": datetime.now()
                     }
-                })
-
-            self.rpm.db.update(
-                'customers', {
-                    "username": user,
-                    "progress.restaurant_id": ObjectId(str(owner["_id"])),
-                    "progress.completed_rewards.redemption_code": code
-                }, {
-                    "$set": {
-                        "progress." + str(restaurant_index) +\
-                            ".completed_rewards." + str(customer_index):
-                            {
-                                "redemption_code": code,
-                                "text": text,
-                                "is_redeemed": True,
-                                "redemption_date": datetime.now()
-                            }
-                    }
-                })
-
-            return "Successfully marked as redeemed!"
+                }, {"_id": 1})
+            if redeemed is not None:
+                return "Successfully marked as redeemed!"
+            if self.rpm.db.query('redemptions', redemption, {"_id": 1}):
+                return "Code has already been redeemed!"
+            return "Invalid QR code!"
+        except UpdateFailureException:
+            print("There was an issue updating")
+            return "Error"
         except QueryFailureException:
             print("Something is wrong with the query")
             return "Error"
-        return "Error"
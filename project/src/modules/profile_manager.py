@@ -5,6 +5,10 @@ This file contains a generic profile manager that performs basic profile handlin
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from modules.database import Database, QueryFailureException, InsertFailureException
+from modules.cache import TTLCache, USER_TTL
+
+# Caches (fullname, hashed password) by (collection, username) for user loading
+USER_CACHE = TTLCache(USER_TTL, maxsize=10000, name="users")
 
 
 class ProfileManager(UserMixin):
@@ -43,6 +47,7 @@ class ProfileManager(UserMixin):
                     "username": self.id,
                     "hashed_password": self.hashed_pw
                 })
+            self.invalidate_user()
             return "Profile set successfully."
         except InsertFailureException:
             return "There was an issue creating a new user profile."
@@ -53,7 +58,7 @@ class ProfileManager(UserMixin):
         """
         try:
             user = self.db.query(self.database_collection,
-                                 {'username': self.id})
+                                 {'username': self.id}, {"_id": 1})
             return len(user) != 0
         except QueryFailureException:
             print("Something's wrong with the query.")
@@ -64,10 +69,34 @@ class ProfileManager(UserMixin):
         """
         try:
             user = self.db.query(self.database_collection,
-                                 {'username': self.id})
+                                 {'username': self.id}, {
+                                     "fullname": 1,
+                                     "hashed_password": 1
+                                 })
             if len(user) > 0:
                 self.fullname = user[0]['fullname']
                 self.hashed_pw = user[0]['hashed_password']
+                USER_CACHE.set((self.database_collection, self.id),
+                               (self.fullname, self.hashed_pw))
             return "Got user successfully."
         except QueryFailureException:
             return "There was an issue retrieving user credentials."
+
+    def get_cached_user(self):
+        """
+        Update an instance to fully represent a user, reusing the credentials
+        read within the last USER_TTL seconds if there are any. Used to load
+        the logged in user on every request.
+        """
+        cached = USER_CACHE.get((self.database_collection, self.id))
+        if cached is None:
+            return self.get_user()
+        self.fullname, self.hashed_pw = cached
+        return "Got user successfully."
+
+    def invalidate_user(self):
+        """
+        Forget the cached credentials of this user. Must be called whenever
+        their name or password changes.
+        """
+        USER_CACHE.invalidate((self.database_collection, self.id))
@@ -0,0 +1,117 @@
+"""
+This file houses the QR code image store. Images are rendered once per payload
+and kept both in memory and on disk, so repeat views cost no encoding and
+survive server restarts. Every QR_PRUNE_INTERVAL images written, the images
+least recently read from disk are removed until at most QR_DISK_CACHE_SIZE
+remain. Reads served from memory do not count, so this is only roughly least
+recently used.
+"""
+
+import os
+import hashlib
+import itertools
+import tempfile
+from flask_qrcode import QRcode
+from modules.cache import TTLCache
+from modules.metrics import QR_ENCODE_LATENCY
+
+# Directory rendered images are kept in, shared by every server process
+QR_CACHE_DIR = os.environ.get("BYTES_QR_CACHE_DIR",
+                              os.path.join(tempfile.gettempdir(), "bytes-qr"))
+
+# Number of rendered images each server process keeps in memory
+QR_CACHE_SIZE = int(os.environ.get("BYTES_QR_CACHE_SIZE", 1024))
+
+# Number of rendered images kept on disk, shared by every server process
+QR_DISK_CACHE_SIZE = int(os.environ.get("BYTES_QR_DISK_CACHE_SIZE", 10000))
+
+# Number of images each server process writes to disk between prunes
+QR_PRUNE_INTERVAL = 100
+
+# Counts the images this server process has written to disk
+QR_WRITES = itertools.count(1)
+
+QR_CACHE = TTLCache(None, maxsize=QR_CACHE_SIZE, name="qr_codes")
+
+
+def get_qr_key(data, box_size):
+    """
+    Return the key identifying the QR code image of the given payload and box
+    size. It is also used as the image's file name and ETag.
+    """
+    return hashlib.sha256(("%d:%s" % (box_size, data)).encode()).hexdigest()
+
+
+def read_qr_file(key):
+    """
+    Return the image stored on disk under key, or None if there is none. The
+    image is marked as read, so that it is pruned last.
+    """
+    path = os.path.join(QR_CACHE_DIR, key + ".png")
+    try:
+        with open(path, "rb") as image:
+            data = image.read()
+        os.utime(path)
+        return data
+    except OSError:
+        return None
+
+
+def prune_qr_files():
+    """
+    Remove the images least recently read or written on disk until at most
+    QR_DISK_CACHE_SIZE remain. Images removed by another process meanwhile
+    are skipped.
+    """
+    images = []
+    for entry in os.scandir(QR_CACHE_DIR):
+        if entry.name.endswith(".png"):
+            try:
+                images.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                pass
+    if len(images) <= QR_DISK_CACHE_SIZE:
+        return
+    images.sort()
+    for _, path in images[:len(images) - QR_DISK_CACHE_SIZE]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def write_qr_file(key, image):
+    """
+    Store an image on disk under key, pruning the images on disk every
+    QR_PRUNE_INTERVAL writes. The image is written to a temporary file first,
+    so other processes never read a partial image.
+    """
+    try:
+        os.makedirs(QR_CACHE_DIR, exist_ok=True)
+        handle, path = tempfile.mkstemp(dir=QR_CACHE_DIR)
+        with os.fdopen(handle, "wb") as temp:
+            temp.write(image)
+        os.replace(path, os.path.join(QR_CACHE_DIR, key + ".png"))
+        if next(QR_WRITES) % QR_PRUNE_INTERVAL == 0:
+            prune_qr_files()
+    except OSError as error:  # The memory cache still holds the image
+        print(error)
+
+
+def get_qr_code(data, box_size=10):
+    """
+    Return the PNG bytes of the QR code encoding data, where box_size is the
+    number of pixels of each box of the code. Images are read from memory,
+    then disk, and are only rendered if neither has them.
+    """
+    key = get_qr_key(data, box_size)
+    image = QR_CACHE.get(key)
+    if image is None:
+        image = read_qr_file(key)
+        if image is None:
+            with QR_ENCODE_LATENCY.time():
+                image = QRcode.qrcode(data, mode="raw",
+                                      box_size=box_size).getvalue()
+            write_qr_file(key, image)
+        QR_CACHE.set(key, image)
+    return image
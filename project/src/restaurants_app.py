@@ -7,6 +7,9 @@ import os
 from flask import Flask, redirect
 from modules.owner.restaurant_profile_manager import RestaurantProfileManager
 from routes.authentication import get_auth_routes, add_auth
+from routes.maintenance import add_maintenance
+from routes.instrumentation import add_instrumentation
+from routes.metrics import add_metrics
 from routes.restaurants.profile import bp as profile_routes
 from routes.restaurants.board import bp as board_routes
 from routes.restaurants.customize import bp as customize_routes
@@ -17,6 +20,9 @@ app = Flask(__name__,
             template_folder="templates/restaurants",
             static_folder="static/restaurants")
 add_auth(app, RestaurantProfileManager)
+add_maintenance(app)
+add_instrumentation(app)
+add_metrics(app)
 app.register_blueprint(get_auth_routes(RestaurantProfileManager))
 app.register_blueprint(profile_routes, url_prefix="/profile")
 app.register_blueprint(board_routes, url_prefix="/board")
@@ -5,21 +5,27 @@ the whole rewards app together and provide a way to start a server.
 
 import os
 from flask import Flask, redirect
-from flask_qrcode import QRcode
 from modules.customer.customer_profile_manager import CustomerProfileManager
 from routes.authentication import get_auth_routes, add_auth
+from routes.maintenance import add_maintenance
+from routes.instrumentation import add_instrumentation
+from routes.metrics import add_metrics
 from routes.rewards.profile import bp as profile_routes
 from routes.rewards.restaurants import bp as restaurant_routes
+from routes.rewards.qr_codes import bp as qr_code_routes
 
 app = Flask(
     __name__,
     template_folder="templates/rewards",
     static_folder="static/rewards")  # Initialize a flask app using current file
 add_auth(app, CustomerProfileManager)
-QRcode(app)
+add_maintenance(app)
+add_instrumentation(app)
+add_metrics(app)
 app.register_blueprint(get_auth_routes(CustomerProfileManager))
 app.register_blueprint(profile_routes, url_prefix="/personal")
 app.register_blueprint(restaurant_routes, url_prefix="/restaurants")
+app.register_blueprint(qr_code_routes, url_prefix="/qr")
 
 
 @app.route('/')
@@ -20,10 +20,10 @@ def add_auth(app, profile_manager):
     @login_manager.user_loader
     def load_user(username):
         """
-        Load user from database.
+        Load user from the user cache, or the database if it is not cached.
         """
         possible_user = profile_manager(username)
-        possible_user.get_user()
+        possible_user.get_cached_user()
         return possible_user
 
 
@@ -0,0 +1,46 @@
+"""
+This file contains the request instrumentation shared by both apps. It reports
+the database calls each request made in a Server-Timing header, and logs the
+requests slower than SLOW_REQUEST_MS.
+"""
+
+import json
+import time
+from flask import g, request
+from modules.instrumentation import get_calls, SLOW_REQUEST_MS
+
+
+def add_instrumentation(app):
+    """
+    Add database call reporting to every request of the given app.
+    """
+
+    @app.before_request
+    def start_timer():
+        """
+        Note when the request started.
+        """
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def report_calls(response):
+        """
+        Add a Server-Timing header with the request's database time and call
+        count, and log the request with its calls if it was slow.
+        """
+        if "request_start" not in g:  # Started before instrumentation
+            return response
+        total = (time.perf_counter() - g.request_start) * 1000
+        calls = get_calls()
+        db_time = sum(call[3] for call in calls) * 1000
+        response.headers.add(
+            "Server-Timing", 'db;dur=%.1f;desc="%d calls", total;dur=%.1f' %
+            (db_time, len(calls), total))
+        if total > SLOW_REQUEST_MS:
+            app.logger.warning(
+                "Slow request: %s %s took %.1fms with %d db calls (%.1fms)%s",
+                request.method, request.path, total, len(calls), db_time,
+                "".join("\n  %s %s %s %.1fms" %
+                        (operation, collection, json.dumps(shape), seconds *
+                         1000) for operation, collection, shape, seconds in calls))
+        return response
@@ -0,0 +1,106 @@
+"""
+This file contains the maintenance tasks shared by both apps. These run at
+startup or from the command line (i.e `flask index-report`) rather than in
+response to a user.
+"""
+
+import time
+import click
+from modules.indexes import IndexManager
+from modules.migrations import (migrate_redemptions, migrate_progress,
+                               migrate_directory_fields)
+from modules.owner.board_rotation import (BoardRotationScheduler,
+                                          rotate_expired_boards,
+                                          ROTATION_INTERVAL)
+
+
+def add_maintenance(app):
+    """
+    Add startup maintenance and maintenance commands to the given app.
+    """
+
+    @app.before_first_request
+    def bootstrap_indexes():
+        """
+        Create any missing database indexes before serving the first request.
+        Requests are refused until every unique index exists.
+        """
+        IndexManager().ensure_indexes(strict=True)
+
+    @app.before_first_request
+    def start_board_rotation():
+        """
+        Start rotating expired bingo boards in the background, so that
+        viewing a board never has to. Disabled while testing, and under
+        gunicorn, where the rotate-boards command rotates them instead.
+        """
+        if not app.testing and ROTATION_INTERVAL > 0:
+            app.extensions["board_rotation"] = BoardRotationScheduler(app)
+            app.extensions["board_rotation"].start()
+
+    @app.cli.command("ensure-indexes")
+    def ensure_indexes():
+        """
+        Create any missing database indexes.
+        """
+        failed = IndexManager().ensure_indexes()
+        for collection, name in failed:
+            click.echo("Failed to create %s.%s" % (collection, name))
+        if not failed:
+            click.echo("All indexes exist.")
+
+    @app.cli.command("index-report")
+    def index_report():
+        """
+        Report declared indexes that are missing and indexes that are unused.
+        """
+        report = IndexManager().get_report()
+        for kind in ("missing", "unused"):
+            for collection, name in report[kind]:
+                click.echo("%s: %s.%s" % (kind, collection, name))
+        if not report["missing"] and not report["unused"]:
+            click.echo("All indexes exist and are in use.")
+
+    @app.cli.command("rotate-boards")
+    @click.option("--interval",
+                  type=int,
+                  default=0,
+                  help="Keep rotating every INTERVAL seconds.")
+    def rotate_boards(interval):
+        """
+        Replace expired bingo boards with their future boards. Each pass runs
+        in its own app context so that no documents are kept between passes.
+        """
+        while True:
+            with app.app_context():
+                rotated = rotate_expired_boards()
+            click.echo("Rotated %d boards." % rotated)
+            if interval <= 0:
+                break
+            time.sleep(interval)
+
+    @app.cli.command("migrate-redemptions")
+    def migrate_rewards():
+        """
+        Move issued rewards out of owner and customer documents into the
+        redemptions collection.
+        """
+        IndexManager().ensure_indexes(strict=True)
+        click.echo("Moved %d rewards." % migrate_redemptions())
+
+    @app.cli.command("migrate-progress")
+    def migrate_customer_progress():
+        """
+        Move customers' progress out of their documents into the progress
+        collection.
+        """
+        IndexManager().ensure_indexes(strict=True)
+        click.echo("Moved progress at %d restaurants." % migrate_progress())
+
+    @app.cli.command("migrate-directory")
+    def migrate_directory():
+        """
+        Normalize the category and city of restaurant profiles saved before
+        directory filters ignored case.
+        """
+        click.echo("Normalized %d profiles." % migrate_directory_fields())
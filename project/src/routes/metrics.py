@@ -0,0 +1,53 @@
+"""
+This file contains the metrics reporting shared by both apps. Every request is
+timed and counted, and all metrics are served from /metrics for Prometheus to
+scrape.
+"""
+
+import os
+import time
+from flask import g, request, abort, make_response
+from prometheus_client import CONTENT_TYPE_LATEST
+from modules.metrics import REQUEST_LATENCY, REQUEST_COUNT, get_metrics
+
+# If set, scrapers must send "Authorization: Bearer <token>" to read /metrics
+METRICS_TOKEN = os.environ.get("BYTES_METRICS_TOKEN")
+
+
+def add_metrics(app):
+    """
+    Add request metrics and a /metrics route to the given app.
+    """
+
+    @app.before_request
+    def start_metrics_timer():
+        """
+        Note when the request started.
+        """
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        """
+        Record the request's latency and status code under its endpoint.
+        """
+        if "metrics_start" not in g:  # Started before metrics were added
+            return response
+        endpoint = request.endpoint or "unmatched"
+        REQUEST_LATENCY.labels(app.name, endpoint, request.method).observe(
+            time.perf_counter() - g.metrics_start)
+        REQUEST_COUNT.labels(app.name, endpoint, request.method,
+                             response.status_code).inc()
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        """
+        Serve all metrics in the Prometheus text format.
+        """
+        if METRICS_TOKEN and request.headers.get(
+                "Authorization") != "Bearer " + METRICS_TOKEN:
+            abort(401)
+        response = make_response(get_metrics())
+        response.headers["Content-Type"] = CONTENT_TYPE_LATEST
+        return response
@@ -20,9 +20,8 @@ def view_board():
     """
     rest_id = current_user.get_restaurant_id()
     try:
-        gbm = GameBoardManager(current_user)
-        gbm.update_board(rest_id)
-        bingo_board = gbm.get_restaurant_board_by_id(rest_id)
+        bingo_board = GameBoardManager(current_user).get_restaurant_board_by_id(
+            rest_id)
 
         if bingo_board["board"] == []:
             return redirect("/board/edit")
@@ -45,9 +44,7 @@ def edit_board():
     When retrieving this route, get a restaurant profile's goals, rewards and future
     board. Render these items together to show a bingo editor.
     """
-    rest_id = current_user.get_restaurant_id()
     gbm = GameBoardManager(current_user)
-    gbm.update_board(rest_id)
     bingo_board = gbm.get_future_board()
     current_expiry = gbm.get_current_board_expiry()
 
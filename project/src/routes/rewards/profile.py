@@ -6,7 +6,7 @@ from flask import Blueprint, render_template, redirect
 from flask_login import current_user, login_required
 from modules.owner.restaurant_profile_manager import RestaurantProfileManager
 from modules.owner.public_profile import PublicProfileModifier
-from modules.customer.favourite import update_favourite, get_favourite, get_favourite_doc
+from modules.customer.favourite import update_favourite, get_favourite
 from modules.customer.customer_board import get_reward_progress
 
 bp = Blueprint("profile", __name__)
@@ -30,8 +30,8 @@ def view_favourites():
     """
     favourite = get_favourite(current_user)
     rpm = RestaurantProfileManager("")
-    profiles = PublicProfileModifier(rpm).get_public_profiles()
-    list_fav = get_favourite_doc(profiles, favourite)
+    list_fav = PublicProfileModifier(rpm).get_public_profiles_by_ids(favourite
+                                                                    or [])
     return render_template('view_favourites.j2',
                            profiles=list_fav,
                            favourite=favourite)
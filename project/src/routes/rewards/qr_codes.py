@@ -0,0 +1,39 @@
+"""
+This file contains routes serving QR code images.
+"""
+
+from flask import Blueprint, request, abort, make_response
+from flask_login import login_required
+from modules.qr_codes import get_qr_code, get_qr_key
+
+bp = Blueprint("qr_codes", __name__)
+
+MAX_DATA_LENGTH = 512  # Longest payload encoded, in characters
+MAX_BOX_SIZE = 40  # Largest box size, in pixels
+
+
+@bp.route('/', methods=['GET'])
+@login_required
+def view_qr_code():
+    """
+    Serve the QR code image of the "data" query parameter, with boxes of
+    "box_size" pixels. An image never changes for a given payload, so browsers
+    may keep it for a year and revalidate it by ETag.
+    """
+    data = request.args.get("data", "")
+    box_size = request.args.get("box_size", 10, type=int)
+    if not data or len(data) > MAX_DATA_LENGTH or \
+            not 1 <= box_size <= MAX_BOX_SIZE:
+        abort(400)
+
+    key = get_qr_key(data, box_size)
+    if request.if_none_match.contains(key):  # The browser has the image
+        response = make_response("", 304)
+    else:
+        response = make_response(get_qr_code(data, box_size))
+        response.mimetype = "image/png"
+    response.set_etag(key)
+    response.cache_control.private = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
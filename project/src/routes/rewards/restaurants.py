@@ -2,13 +2,12 @@
 This file contains routes related to customer profiles.
 """
 
-from flask import Blueprint, render_template, redirect
+from flask import Blueprint, render_template, redirect, request, jsonify
 from flask_login import current_user, login_required
 from modules.owner.restaurant_profile_manager import RestaurantProfileManager
-from modules.owner.game_board import GameBoardManager
 from modules.owner.public_profile import PublicProfileModifier
 from modules.customer.favourite import get_favourite
-from modules.customer.customer_board import set_board_progress, reset_complete_board
+from modules.customer.customer_board import get_board_view, reset_complete_board
 
 bp = Blueprint("restaurants", __name__)
 
@@ -17,14 +16,43 @@ bp = Blueprint("restaurants", __name__)
 @login_required
 def view_profiles():
     """
-    Allows users to view restaurant profiles that are set to public.
+    Allows users to view restaurant profiles that are set to public, a page at
+    a time, optionally filtered by category and city.
     """
     rpm = RestaurantProfileManager("")
-    restaurant_profiles = PublicProfileModifier(rpm).get_public_profiles()
+    restaurant_profiles, cursor = PublicProfileModifier(
+        rpm).get_directory_page(category=request.args.get("category"),
+                                city=request.args.get("city"),
+                                after=request.args.get("after"))
     favourite = get_favourite(current_user)
     return render_template('view_profiles.j2',
                            profiles=restaurant_profiles,
-                           favourite=favourite)
+                           favourite=favourite,
+                           category=request.args.get("category", ""),
+                           city=request.args.get("city", ""),
+                           cursor=cursor)
+
+
+@bp.route('/directory', methods=['GET'])
+@login_required
+def view_directory():
+    """
+    Return a page of public restaurant cards as JSON, optionally filtered by
+    category and city. The "next" cursor is passed as "after" to get the
+    following page, and is null on the last page.
+    """
+    rpm = RestaurantProfileManager("")
+    restaurant_profiles, cursor = PublicProfileModifier(
+        rpm).get_directory_page(category=request.args.get("category"),
+                                city=request.args.get("city"),
+                                after=request.args.get("after"))
+    return jsonify({
+        "restaurants": [
+            dict(profile, _id=str(rest_id))
+            for rest_id, profile in restaurant_profiles.items()
+        ],
+        "next": cursor
+    })
 
 
 @bp.route('/<string:obj_id>/board', methods=['GET', 'POST'])
@@ -34,13 +62,9 @@ def view_board(obj_id):
     Allows users to view the chosen restaurant's game board.
     """
     username = current_user.get_id()
-    rpm = RestaurantProfileManager("")
-    gpm = GameBoardManager(rpm)
-    gpm.update_board(obj_id)
-    board = gpm.get_restaurant_board_by_id(obj_id)
-    set_board_progress(current_user, board, obj_id)
-    board["expiry_date"] = board["expiry_date"].strftime(
-        "%B X%d, %Y - X%I:%M %p UTC").replace("X0", "X").replace("X", "")
+    board = get_board_view(current_user, obj_id)
+    if board is None:  # No game board to show yet
+        return redirect("/restaurants")
 
     return render_template('view_game_board.j2',
                            goals=board["board"],
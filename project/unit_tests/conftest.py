@@ -0,0 +1,115 @@
+"""
+This file houses the fixtures shared by the unit test suites. The seeded
+database runs the apps against a local mongomock database rather than the
+remote one.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+import pytest
+import mongomock
+from bson.objectid import ObjectId
+from werkzeug.security import generate_password_hash
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../src'))  # Import the src folder
+from modules.database import Database
+from modules.indexes import IndexManager
+from modules.profile_manager import USER_CACHE
+from modules.owner.goals import SHARED_GOALS_CACHE
+from modules.owner.rewards import SHARED_REWARDS_CACHE
+from modules.owner.restaurant_profile_manager import RESTAURANT_NAME_CACHE
+
+
+@pytest.fixture
+def seeded_db():
+    """
+    Point the database at a local mongomock database with every declared
+    index, seeded with shared goals and rewards, an owner "owner" with a 3x3
+    board, and a customer "customer" who favourited the owner and has
+    completed the board's center goal and been issued a reward there. Both
+    passwords are "password". Return a dictionary of the database ("db"),
+    the "goals" and "rewards" on the board, the "owner_id" and the unredeemed
+    "redemption_code".
+    """
+    previous = Database.instance
+    db = mongomock.MongoClient().bytes
+    IndexManager(Database.configure(db)).ensure_indexes()
+    for cache in (USER_CACHE, SHARED_GOALS_CACHE, SHARED_REWARDS_CACHE,
+                  RESTAURANT_NAME_CACHE):
+        cache.invalidate()
+
+    goals = [{"_id": ObjectId(), "goal": "Goal " + str(i)} for i in range(9)]
+    rewards = [{
+        "_id": ObjectId(),
+        "reward": "Reward " + str(i)
+    } for i in range(8)]
+    db["goals"].insert_many(goals)
+    db["rewards"].insert_many(rewards)
+    board = {
+        "name": "Board",
+        "size": 3,
+        "expiry_date": datetime.now() + timedelta(days=30),
+        "board": [goal["_id"] for goal in goals],
+        "board_reward": [reward["_id"] for reward in rewards]
+    }
+    password = generate_password_hash("password", method='sha256')
+    owner_id = db["restaurant_users"].insert_one({
+        "username": "owner",
+        "fullname": "Owner",
+        "hashed_password": password,
+        "goals": [],
+        "rewards": [],
+        "bingo_board": board,
+        "future_board": dict(board,
+                             expiry_date=datetime.now() + timedelta(days=120)),
+        "profile": {
+            "name": "Restaurant",
+            "category": "Pizza",
+            "image": "https://images.com/restaurant.jpg",
+            "description": "Simple food. Amazing taste.",
+            "phone_number": "416-555-5555",
+            "location": {
+                "address": "1 Bremner Blvd",
+                "postal_code": "M5V3L9",
+                "city": "Toronto",
+                "province": "ON"
+            },
+            "is_public": True
+        }
+    }).inserted_id
+    db["customers"].insert_one({
+        "username": "customer",
+        "fullname": "Customer",
+        "hashed_password": password,
+        "favourite": [owner_id]
+    })
+    db["progress"].insert_one({
+        "customer": "customer",
+        "restaurant_id": owner_id,
+        "epoch": 0,
+        "completed_goals": [{
+            "_id": goals[4]["_id"],
+            "position": "4",
+            "epoch": 0,
+            "date_completed": datetime.now()
+        }]
+    })
+    code = "customer+" + str(rewards[0]["_id"]) + "+0+" + str(datetime.now())
+    db["redemptions"].insert_one({
+        "redemption_code": code,
+        "restaurant_id": owner_id,
+        "customer": "customer",
+        "reward_id": rewards[0]["_id"],
+        "text": "Reward 0",
+        "is_redeemed": False,
+        "issue_date": datetime.now()
+    })
+    yield {
+        "db": db,
+        "goals": goals,
+        "rewards": rewards,
+        "owner_id": owner_id,
+        "redemption_code": code
+    }
+    Database.instance = previous
@@ -0,0 +1,32 @@
+"""
+This file houses the unit test suite for resolving board ids into goals and
+rewards.
+"""
+
+import os
+import sys
+from bson.objectid import ObjectId
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from modules.owner.game_board import index_by_id, resolve_board_items
+
+
+def test_resolve_keeps_board_order():
+    """
+    Test that resolved goals follow the board's order and skip unknown ids.
+    """
+    goals = [{"_id": ObjectId(), "goal": "Goal " + str(i)} for i in range(3)]
+    ids = [goals[2]["_id"], ObjectId(), goals[0]["_id"]]
+    board = resolve_board_items(ids, index_by_id(goals))
+    assert [cell["goal"] for cell in board] == ["Goal 2", "Goal 0"]
+
+
+def test_resolved_views_leave_catalog_untouched():
+    """
+    Test that writing to a resolved cell does not change the catalog entry.
+    """
+    goal = {"_id": ObjectId(), "goal": "Order a drink"}
+    board = resolve_board_items([goal["_id"]] * 2, index_by_id([goal]))
+    board[0]["is_complete"] = True
+    assert board[0]["is_complete"] and "is_complete" not in board[1]
+    assert goal == {"_id": goal["_id"], "goal": "Order a drink"}
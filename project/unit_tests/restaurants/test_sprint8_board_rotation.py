@@ -0,0 +1,193 @@
+"""
+This file houses the unit test suite for rotating expired bingo boards, one at
+a time and in the background, against the seeded local database (see
+conftest.py).
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from restaurants_app import app
+from modules.owner.board_rotation import rotate_expired_boards
+from modules.owner.game_board import GameBoardManager
+from modules.owner.restaurant_profile_manager import RestaurantProfileManager
+
+
+def add_owner(db, username, expiry, epoch=0, future=True):
+    """
+    Add a restaurant owner whose board expires at the given date, with a
+    future board if future is set. Return the owner's id.
+    """
+    board = {
+        "name": "Board",
+        "size": 3,
+        "expiry_date": expiry,
+        "board": [],
+        "board_reward": [],
+        "epoch": epoch
+    }
+    owner = {"username": username, "bingo_board": board}
+    if future:
+        owner["future_board"] = dict(board,
+                                     name="Future",
+                                     expiry_date=expiry + timedelta(days=90))
+        del owner["future_board"]["epoch"]
+    return db["restaurant_users"].insert_one(owner).inserted_id
+
+
+def rotate_during_update(monkeypatch, db, owner_id):
+    """
+    Make the given owner's board rotate elsewhere just before its rotation
+    here is written, as a concurrent rotation would.
+    """
+    users = db["restaurant_users"]
+    update_one = users.update_one
+
+    def race(query, document, *args, **kwargs):
+        """
+        Rotate the board before the first update of it lands.
+        """
+        if query.get("_id") == owner_id:
+            monkeypatch.setattr(users, "update_one", update_one)
+            update_one({"_id": owner_id}, {
+                "$set": {
+                    "bingo_board.expiry_date":
+                        datetime.now() + timedelta(days=90),
+                    "bingo_board.epoch":
+                        1
+                }
+            })
+        return update_one(query, document, *args, **kwargs)
+
+    monkeypatch.setattr(users, "update_one", race)
+
+
+def get_epochs(db):
+    """
+    Return each owner's board epoch by username.
+    """
+    return {
+        owner["username"]: owner["bingo_board"].get("epoch", 0)
+        for owner in db["restaurant_users"].find()
+    }
+
+
+def test_rotate_expired_boards_in_batches(seeded_db):
+    """
+    Test that every expired board is rotated across several batches, that
+    boards which have not expired are skipped, and that a second pass finds
+    nothing left to rotate.
+    """
+    db = seeded_db["db"]
+    past = datetime.now() - timedelta(days=1)
+    for i in range(5):
+        add_owner(db, "expired" + str(i), past, future=i % 2 == 0)
+    add_owner(db, "rotated", past, epoch=1)
+    add_owner(db, "current", datetime.now() + timedelta(days=1))
+    with app.app_context():
+        assert rotate_expired_boards(batch_size=2) == 6
+    with app.app_context():
+        assert rotate_expired_boards(batch_size=2) == 0
+    assert get_epochs(db) == dict(
+        {"expired" + str(i): 1 for i in range(5)},
+        owner=0, rotated=2, current=0)
+    for owner in db["restaurant_users"].find():
+        assert owner["bingo_board"]["expiry_date"] > datetime.now()
+
+
+def test_rotate_skips_boards_rotated_elsewhere(seeded_db, monkeypatch):
+    """
+    Test that a board rotated elsewhere during the pass is neither rotated
+    again nor counted.
+    """
+    db = seeded_db["db"]
+    past = datetime.now() - timedelta(days=1)
+    raced = add_owner(db, "raced", past)
+    add_owner(db, "expired", past)
+    rotate_during_update(monkeypatch, db, raced)
+    with app.app_context():
+        assert rotate_expired_boards() == 1
+    assert get_epochs(db) == {"owner": 0, "raced": 1, "expired": 1}
+    raced_board = db["restaurant_users"].find_one({"_id": raced})["bingo_board"]
+    assert raced_board["name"] == "Board"
+
+
+def rotate_board(owner_id):
+    """
+    Rotate the given owner's board, returning whether it was rotated.
+    """
+    with app.app_context():
+        return GameBoardManager(RestaurantProfileManager("")).update_board(
+            owner_id)
+
+
+def test_rotation_promotes_future_board(seeded_db):
+    """
+    Test that rotating a board replaces it with the future board in the next
+    epoch, and moves the future board's expiry forward.
+    """
+    db = seeded_db["db"]
+    # whole seconds, as dates are stored to the millisecond
+    expiry = datetime.now().replace(microsecond=0) - timedelta(days=1)
+    owner_id = add_owner(db, "expired", expiry)
+    future_expiry = expiry + timedelta(days=90)
+    assert rotate_board(owner_id)
+    owner = db["restaurant_users"].find_one({"_id": owner_id})
+    assert owner["bingo_board"]["name"] == "Future"
+    assert owner["bingo_board"]["epoch"] == 1
+    assert owner["bingo_board"]["expiry_date"] == future_expiry
+    assert owner["future_board"]["expiry_date"] == future_expiry + timedelta(
+        days=90)
+
+
+def test_rotation_without_future_board(seeded_db):
+    """
+    Test that a board without a future board is kept for another 90 days in
+    the next epoch.
+    """
+    db = seeded_db["db"]
+    owner_id = add_owner(db, "expired",
+                         datetime.now() - timedelta(days=1),
+                         epoch=2,
+                         future=False)
+    assert rotate_board(owner_id)
+    board = db["restaurant_users"].find_one({"_id": owner_id})["bingo_board"]
+    assert board["name"] == "Board"
+    assert board["epoch"] == 3
+    assert timedelta(days=89) < board["expiry_date"] - datetime.now(
+    ) <= timedelta(days=90)
+
+
+def test_concurrent_rotation_happens_once(seeded_db, monkeypatch):
+    """
+    Test that a rotation whose board was rotated elsewhere since it was read
+    matches nothing and changes nothing.
+    """
+    db = seeded_db["db"]
+    owner_id = add_owner(db, "expired", datetime.now() - timedelta(days=1))
+    rotate_during_update(monkeypatch, db, owner_id)
+    assert not rotate_board(owner_id)
+    board = db["restaurant_users"].find_one({"_id": owner_id})["bingo_board"]
+    assert (board["name"], board["epoch"]) == ("Board", 1)
+    assert not rotate_board(owner_id)  # no longer expired
+
+
+def test_rotation_keeps_earlier_progress(seeded_db):
+    """
+    Test that customers' progress on the rotated board is left as it was,
+    while the board moves on to an epoch without progress.
+    """
+    db = seeded_db["db"]
+    db["restaurant_users"].update_one(
+        {"_id": seeded_db["owner_id"]},
+        {"$set": {
+            "bingo_board.expiry_date": datetime.now() - timedelta(days=1)
+        }})
+    before = list(db["progress"].find())
+    assert rotate_board(seeded_db["owner_id"])
+    assert list(db["progress"].find()) == before
+    assert before[0]["epoch"] == 0
+    owner = db["restaurant_users"].find_one({"_id": seeded_db["owner_id"]})
+    assert owner["bingo_board"]["epoch"] == 1
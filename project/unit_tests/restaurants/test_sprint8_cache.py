@@ -0,0 +1,104 @@
+"""
+This file houses the unit test suite for the in-process TTL cache.
+"""
+
+import os
+import sys
+import time
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from prometheus_client import REGISTRY
+from restaurants_app import app
+from modules.cache import TTLCache
+from modules.instrumentation import record_calls
+from modules.owner.restaurant_profile_manager import RestaurantProfileManager
+
+
+def test_cache_hit_and_miss():
+    """
+    Test that cached values are returned and hits and misses are counted.
+    """
+    cache = TTLCache(60)
+    assert cache.get("goals") is None
+    cache.set("goals", ["Order a drink"])
+    assert cache.get("goals") == ["Order a drink"]
+    assert cache.get_stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_cache_expiry():
+    """
+    Test that values are no longer returned once their ttl has passed.
+    """
+    cache = TTLCache(0.01)
+    cache.set("goals", [])
+    time.sleep(0.02)
+    assert cache.get("goals", "expired") == "expired"
+
+
+def test_cache_evicts_least_recently_used():
+    """
+    Test that a full cache evicts its least recently used value.
+    """
+    cache = TTLCache(None, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1
+
+
+def test_cache_invalidate():
+    """
+    Test that invalidation removes one value or all of them.
+    """
+    cache = TTLCache(60)
+    cache.set("goals", [])
+    cache.set("rewards", [])
+    cache.invalidate("goals")
+    assert cache.get("goals") is None and cache.get("rewards") == []
+    cache.invalidate()
+    assert cache.get_stats()["size"] == 0
+
+
+def test_named_cache_reports_metrics():
+    """
+    Test that a named cache counts its hits and misses in the metrics.
+    """
+    cache = TTLCache(60, name="test_cache")
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    assert REGISTRY.get_sample_value("bytes_cache_requests_total", {
+        "cache": "test_cache",
+        "result": "hit"
+    }) == 1
+    assert REGISTRY.get_sample_value("bytes_cache_requests_total", {
+        "cache": "test_cache",
+        "result": "miss"
+    }) == 1
+
+
+def get_cached_owner():
+    """
+    Return the seeded owner's cached name and the number of database calls
+    made to load it.
+    """
+    with app.app_context(), record_calls() as calls:
+        owner = RestaurantProfileManager("owner")
+        assert owner.get_cached_user() == "Got user successfully."
+    return owner.fullname, len(calls)
+
+
+def test_cached_user_until_invalidated(seeded_db):
+    """
+    Test that a user's credentials are read from the db once, then from the
+    cache even after they change, until the user is invalidated.
+    """
+    assert get_cached_owner() == ("Owner", 1)
+    seeded_db["db"]["restaurant_users"].update_one(
+        {"username": "owner"}, {"$set": {
+            "fullname": "Renamed"
+        }})
+    assert get_cached_owner() == ("Owner", 0)
+    RestaurantProfileManager("owner").invalidate_user()
+    assert get_cached_owner() == ("Renamed", 1)
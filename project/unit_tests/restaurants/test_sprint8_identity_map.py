@@ -0,0 +1,98 @@
+"""
+This file houses the unit test suite for the request-scoped identity map
+kept by the database.
+"""
+
+import os
+import sys
+import pytest
+import mongomock
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from restaurants_app import app
+from modules.database import Database, QueryFailureException
+from modules.instrumentation import get_calls
+
+
+def test_whole_document_covers_projection():
+    """
+    Test that a whole cached document covers any requested projection.
+    """
+    assert Database.covers_projection(None, {"goals": 1})
+    assert not Database.covers_projection({"goals": 1}, None)
+
+
+def test_parent_field_covers_nested_field():
+    """
+    Test that a cached parent field covers requests for its nested fields.
+    """
+    cached = {"bingo_board": 1, "goals": 1, "rewards": 1}
+    assert Database.covers_projection(cached, {"bingo_board.size": 1})
+    assert Database.covers_projection(cached, {"_id": 1})
+    assert not Database.covers_projection(cached, {"future_board": 1})
+
+
+def test_operator_projection_must_match():
+    """
+    Test that operator projections such as $elemMatch are only covered by
+    the same projection.
+    """
+    requested = {"progress": {"$elemMatch": {"restaurant_id": 1}}}
+    assert Database.covers_projection(dict(requested), requested)
+    assert not Database.covers_projection({"progress.completed_goals": 1},
+                                          requested)
+
+
+def test_invalidate_collection():
+    """
+    Test that invalidating a collection drops its cached documents only.
+    """
+    with app.app_context():
+        identity_map = Database.get_identity_map()
+        identity_map["customers"] = {"{}": []}
+        identity_map["goals"] = {"{}": []}
+        Database.invalidate("customers")
+        assert "customers" not in Database.get_identity_map()
+        assert "goals" in Database.get_identity_map()
+
+
+def test_streamed_query_bypasses_identity_map():
+    """
+    Test that a streamed query returns an iterator and keeps nothing in the
+    identity map, so repeating it reaches the db again. The streamed call is
+    recorded once its documents have been read.
+    """
+    previous = Database.instance
+    db = Database.configure(mongomock.MongoClient().bytes)
+    db.db["goals"].insert_many([{"goal": "Goal " + str(i)} for i in range(3)])
+    try:
+        with app.app_context():
+            goals = db.query("goals", stream=True)
+            assert not isinstance(goals, list)
+            assert next(goals)["goal"] == "Goal 0"
+            assert get_calls() == []
+            assert [goal["goal"] for goal in goals] == ["Goal 1", "Goal 2"]
+            assert len(get_calls()) == 1
+            assert "goals" not in Database.get_identity_map()
+            assert len(db.query("goals", raw=True)) == 3
+            assert len(get_calls()) == 2
+    finally:
+        Database.instance = previous
+
+
+def test_streamed_query_failure():
+    """
+    Test that a failure while reading streamed documents is reported as a
+    query failure, and the call is still recorded.
+    """
+    previous = Database.instance
+    db = Database.configure(mongomock.MongoClient().bytes)
+    db.db["goals"].insert_one({"goal": "Goal 0"})
+    try:
+        with app.app_context():
+            goals = db.query("goals", {"goal": {"$unknown": 1}}, stream=True)
+            with pytest.raises(QueryFailureException):
+                list(goals)
+            assert len(get_calls()) == 1
+    finally:
+        Database.instance = previous
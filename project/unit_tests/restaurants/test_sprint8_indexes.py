@@ -0,0 +1,89 @@
+"""
+This file houses the unit test suite for the declared database indexes.
+"""
+
+import os
+import sys
+import pytest
+import mongomock
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from modules.database import Database, IndexFailureException
+from modules.indexes import INDEXES, IndexManager, get_index_name
+
+
+def test_index_name_matches_mongo():
+    """
+    Test that index names follow MongoDB's default naming.
+    """
+    assert get_index_name([("username", 1)]) == "username_1"
+    assert get_index_name([("profile.is_public", 1),
+                           ("_id", 1)]) == "profile.is_public_1__id_1"
+
+
+def test_usernames_are_unique():
+    """
+    Test that both user collections declare a unique username index.
+    """
+    for collection in ("restaurant_users", "customers"):
+        assert (collection, [("username", 1)], {"unique": True}) in INDEXES
+
+
+def test_progress_is_unique_per_board():
+    """
+    Test that customers have at most one progress document per restaurant
+    board epoch.
+    """
+    assert ("progress", [("customer", 1), ("restaurant_id", 1), ("epoch", 1)],
+            {
+                "unique": True
+            }) in INDEXES
+
+
+def test_ensure_indexes_creates_declared_indexes():
+    """
+    Test that every declared index exists once they are ensured, and that
+    ensuring them again changes nothing.
+    """
+    previous = Database.instance
+    try:
+        manager = IndexManager(
+            Database.configure(mongomock.MongoClient().bytes))
+        assert manager.get_missing_indexes() != []
+        assert manager.ensure_indexes() == []
+        assert manager.ensure_indexes() == []
+        assert manager.get_missing_indexes() == []
+    finally:
+        Database.instance = previous
+
+
+def test_directory_filters_are_indexed():
+    """
+    Test that every directory filter has an index ending in _id, so that pages
+    are read in order without sorting.
+    """
+    for field in ("profile.category", "profile.location.city"):
+        assert ("restaurant_users", [("profile.is_public", 1), (field, 1),
+                                     ("_id", 1)], {}) in INDEXES
+
+
+def test_strict_indexes_require_unique_indexes():
+    """
+    Test that strictly ensuring the indexes fails when a unique index cannot
+    be created, here because of duplicate progress documents.
+    """
+    previous = Database.instance
+    try:
+        db = mongomock.MongoClient().bytes
+        db["progress"].insert_many([{
+            "customer": "customer",
+            "restaurant_id": 1,
+            "epoch": 0
+        } for _ in range(2)])
+        manager = IndexManager(Database.configure(db))
+        assert ("progress", "customer_1_restaurant_id_1_epoch_1"
+               ) in manager.ensure_indexes()
+        with pytest.raises(IndexFailureException):
+            manager.ensure_indexes(strict=True)
+    finally:
+        Database.instance = previous
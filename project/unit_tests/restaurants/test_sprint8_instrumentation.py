@@ -0,0 +1,117 @@
+"""
+This file houses the unit test suite for the database instrumentation.
+"""
+
+import os
+import re
+import sys
+import json
+import logging
+from flask import Flask
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from restaurants_app import app
+from routes import instrumentation
+from modules.instrumentation import (get_query_shape, get_calls, track,
+                                     record_calls)
+
+
+def test_query_shape_hides_values():
+    """
+    Test that a query's shape keeps its fields and operators only.
+    """
+    assert get_query_shape({
+        "username": "junaid",
+        "_id": {
+            "$in": ["5ef5009bccd1e88ead4cd076"]
+        },
+        "$or": [{
+            "epoch": 0
+        }]
+    }) == {
+        "username": "?",
+        "_id": {
+            "$in": "?"
+        },
+        "$or": [{
+            "epoch": "?"
+        }]
+    }
+
+
+def test_track_records_calls():
+    """
+    Test that tracked calls are recorded in the app context, even if they fail.
+    """
+    with Flask(__name__).app_context():
+        with track("find", "customers", {"username": "junaid"}):
+            pass
+        try:
+            with track("update", "customers"):
+                raise ValueError()
+        except ValueError:
+            pass
+        calls = get_calls()
+    assert [call[:3] for call in calls] == [("find", "customers", {
+        "username": "?"
+    }), ("update", "customers", "?")]
+    assert all(call[3] >= 0 for call in calls)
+
+
+def test_track_outside_app_context():
+    """
+    Test that calls made outside an app context are not recorded.
+    """
+    with track("find", "customers"):
+        pass
+    assert get_calls() == []
+
+
+def get_logged_in_client():
+    """
+    Return a testing client logged in as the seeded owner (see conftest.py).
+    """
+    app.config['TESTING'] = True
+    client = app.test_client()
+    client.post("/login", data={"username": "owner", "password": "password"})
+    return client
+
+
+def test_server_timing_reports_calls(seeded_db):
+    """
+    Test that the Server-Timing header reports the number of database calls
+    the request made.
+    """
+    client = get_logged_in_client()
+    with record_calls() as calls:
+        res = client.get("/board/")
+    timing = res.headers["Server-Timing"]
+    assert re.match(r'db;dur=[0-9.]+;desc="(\d+) calls", total;dur=[0-9.]+$',
+                    timing)
+    assert timing.split('"')[1] == "%d calls" % len(calls)
+    assert len(calls) > 0
+
+
+def test_slow_request_logs_calls(seeded_db, caplog, monkeypatch):
+    """
+    Test that a slow request is logged with each of its calls' collection and
+    query shape, but none of the queried values.
+    """
+    client = get_logged_in_client()
+    monkeypatch.setattr(instrumentation, "SLOW_REQUEST_MS", 0)
+    with caplog.at_level(logging.WARNING, logger=app.logger.name):
+        with record_calls() as calls:
+            client.get("/board/")
+    records = [
+        record.getMessage()
+        for record in caplog.records
+        if record.getMessage().startswith("Slow request: GET /board/")
+    ]
+    assert len(records) == 1 and calls
+    lines = records[0].split("\n")
+    assert "with %d db calls" % len(calls) in lines[0]
+    assert len(lines) == len(calls) + 1
+    for line, (operation, collection, shape, _) in zip(lines[1:], calls):
+        assert line.startswith("  %s %s %s " %
+                               (operation, collection, json.dumps(shape)))
+    assert "owner" not in records[0]
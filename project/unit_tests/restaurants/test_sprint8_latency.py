@@ -0,0 +1,41 @@
+"""
+This file houses the unit test suite for the latency-injecting database backend.
+"""
+
+import os
+import sys
+import time
+import mongomock
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from modules.latency import LatencyBackend
+
+
+def test_round_trips_counted():
+    """
+    Test that round trips are counted by collection and operation, while
+    reading a cursor is not a round trip of its own.
+    """
+    backend = LatencyBackend(mongomock.MongoClient().bytes)
+    backend["customers"].insert_one({"username": "junaid"})
+    assert list(backend["customers"].find({"username": "junaid"}))
+    assert backend.get_count() == 2
+    assert backend.counts[("customers", "find")] == 1
+    backend.reset()
+    assert backend.get_count() == 0
+
+
+def test_round_trips_delayed():
+    """
+    Test that every round trip waits for its latency, which may be overridden
+    per operation.
+    """
+    backend = LatencyBackend(mongomock.MongoClient().bytes,
+                             latency_ms=0,
+                             latencies={"find_one": 50})
+    start = time.perf_counter()
+    backend["customers"].insert_one({"username": "junaid"})
+    assert time.perf_counter() - start < 0.05
+    start = time.perf_counter()
+    assert backend["customers"].find_one({"username": "junaid"})
+    assert time.perf_counter() - start >= 0.05
@@ -0,0 +1,61 @@
+"""
+This file houses the unit test suite for the Prometheus metrics served from
+/metrics, against the seeded local database (see conftest.py).
+"""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from prometheus_client import CONTENT_TYPE_LATEST
+from restaurants_app import app
+from routes import metrics
+
+
+def get_client():
+    """
+    Return a testing client logged in as the seeded owner.
+    """
+    app.config['TESTING'] = True
+    client = app.test_client()
+    client.post("/login", data={"username": "owner", "password": "password"})
+    return client
+
+
+def test_metrics_report_requests_and_calls(seeded_db, monkeypatch):
+    """
+    Test that /metrics is served in the Prometheus text format, and reports a
+    request under its endpoint and status, and the database calls it made
+    under their collection.
+    """
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", None)
+    client = get_client()
+    assert client.get("/profile/").status_code == 200
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["Content-Type"] == CONTENT_TYPE_LATEST
+    lines = res.get_data(as_text=True).split("\n")
+    assert any(
+        line.startswith("bytes_requests_total{") and
+        'app="%s"' % app.name in line and
+        'endpoint="profile.view_profile"' in line and 'method="GET"' in line and
+        'status="200"' in line for line in lines)
+    assert any(
+        line.startswith("bytes_db_call_duration_seconds_count{") and
+        'collection="restaurant_users"' in line and 'operation="find"' in line
+        for line in lines)
+
+
+def test_metrics_token_required(seeded_db, monkeypatch):
+    """
+    Test that /metrics is refused without the bearer token once one is set.
+    """
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "secret")
+    client = get_client()
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={
+        "Authorization": "Bearer wrong"
+    }).status_code == 401
+    assert client.get("/metrics", headers={
+        "Authorization": "Bearer secret"
+    }).status_code == 200
@@ -0,0 +1,69 @@
+"""
+This file houses the unit test suite for converting id strings in queries to
+ObjectIds.
+"""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from bson.objectid import ObjectId
+from modules.database import Database
+
+GOAL_ID = "5ef5009bccd1e88ead4cd076"
+
+
+def test_id_fields_converted():
+    """
+    Test that id strings are converted, including within operators.
+    """
+    assert Database.convert_ids("restaurant_users", {
+        "_id": GOAL_ID
+    }) == {
+        "_id": ObjectId(GOAL_ID)
+    }
+    assert Database.convert_ids("progress", {
+        "restaurant_id": {
+            "$in": [GOAL_ID]
+        }
+    }) == {
+        "restaurant_id": {
+            "$in": [ObjectId(GOAL_ID)]
+        }
+    }
+
+
+def test_other_fields_left_alone():
+    """
+    Test that strings looking like ids are left alone outside of id fields.
+    """
+    query = {"username": GOAL_ID, "profile.name": GOAL_ID}
+    assert Database.convert_ids("restaurant_users", query) == query
+    assert Database.convert_ids("customers", {
+        "username": GOAL_ID
+    }) == {
+        "username": GOAL_ID
+    }
+
+
+def test_array_id_fields_converted():
+    """
+    Test that id fields of matched subdocuments are converted, even when
+    the match is negated.
+    """
+    query = {
+        "completed_goals": {
+            "$not": {
+                "$elemMatch": {
+                    "_id": GOAL_ID,
+                    "position": "0"
+                }
+            }
+        }
+    }
+    converted = Database.convert_ids("progress", query)
+    assert converted["completed_goals"]["$not"]["$elemMatch"] == {
+        "_id": ObjectId(GOAL_ID),
+        "position": "0"
+    }
+    assert query["completed_goals"]["$not"]["$elemMatch"]["_id"] == GOAL_ID
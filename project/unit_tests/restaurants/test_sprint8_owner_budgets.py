@@ -0,0 +1,180 @@
+"""
+This file houses the unit test suite holding the restaurant owner routes to a
+budget of database round trips. The app runs against the seeded local
+database (see conftest.py), and every database call made while serving a
+request is recorded. Budgets are for a logged in owner whose credentials and
+the shared goals and rewards are already cached, as they are on most requests.
+"""
+
+import os
+import sys
+import pytest
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from restaurants_app import app
+from modules.instrumentation import record_calls
+
+# Largest number of database calls each route may make
+ROUTE_BUDGETS = {
+    "/profile/": 1,
+    "/board/": 2,
+    "/board/edit": 4,
+    "/board/save": 2,
+    "/customize/": 2,
+    "/customize/add-goal": 2,
+    "/customize/delete-goal": 2,
+    "/customize/add-reward": 2,
+    "/customize/delete-reward": 2,
+    "/verification/verify": 1,
+    "/verification/finish-goal": 4,  # A refused scan is retried once
+    "/verification/finish-reward": 3  # A refused code is looked up again
+}
+
+
+@pytest.fixture
+def client(seeded_db):
+    """
+    Return a testing client logged in as the seeded owner, with the seeded
+    database as its "seed".
+    """
+    app.config['TESTING'] = True
+    client = app.test_client()
+    client.post("/login", data={"username": "owner", "password": "password"})
+    client.get("/board/")  # Caches the shared goals and rewards
+    client.seed = seeded_db
+    return client
+
+
+def get_calls(client, url, data=None):
+    """
+    Return the response to the given url, posting data if there is any, and
+    the database calls made while serving it.
+    """
+    with record_calls() as calls:
+        if data is None:
+            res = client.get(url)
+        else:
+            res = client.post(url, data=data)
+    assert res.status_code < 400
+    return res, calls
+
+
+def get_goal_code(client, position):
+    """
+    Return the QR code of the goal at the given position, scanned by the
+    seeded customer.
+    """
+    goal_id = client.seed["goals"][position]["_id"]
+    return "customer+" + str(goal_id) + "+" + str(position)
+
+
+@pytest.mark.parametrize("url", ["/profile/", "/board/", "/board/edit",
+                                 "/customize/"])
+def test_page_within_budget(client, url):
+    """
+    Test that loading a page stays within its budget once caches are warm.
+    """
+    get_calls(client, url)
+    _, calls = get_calls(client, url)
+    assert len(calls) <= ROUTE_BUDGETS[url], calls
+
+
+def test_save_board_within_budget(client):
+    """
+    Test that saving the future board stays within its budget.
+    """
+    url = "/board/save"
+    _, calls = get_calls(
+        client, url, {
+            "board_name": "Board",
+            "size": "3",
+            "expiry_date": "12/31/2030",
+            "board[]": [str(goal["_id"]) for goal in client.seed["goals"]],
+            "board_reward[]": [
+                str(reward["_id"]) for reward in client.seed["rewards"]
+            ]
+        })
+    assert len(calls) <= ROUTE_BUDGETS[url], calls
+    future = client.seed["db"]["restaurant_users"].find_one()["future_board"]
+    assert future["board"] == [goal["_id"] for goal in client.seed["goals"]]
+
+
+@pytest.mark.parametrize("kind", ["goal", "reward"])
+def test_customize_within_budget(client, kind):
+    """
+    Test that adding and deleting a custom goal or reward stay within their
+    budgets.
+    """
+    url = "/customize/add-" + kind
+    _, calls = get_calls(client, url, {kind: "Custom " + kind})
+    assert len(calls) <= ROUTE_BUDGETS[url], calls
+    custom = client.seed["db"]["restaurant_users"].find_one()[kind + "s"]
+    assert [item[kind] for item in custom] == ["Custom " + kind]
+
+    url = "/customize/delete-" + kind
+    _, calls = get_calls(client, url,
+                         {"deleted-" + kind: str(custom[0]["_id"])})
+    assert len(calls) <= ROUTE_BUDGETS[url], calls
+    assert client.seed["db"]["restaurant_users"].find_one()[kind + "s"] == []
+
+
+def test_verify_within_budget(client):
+    """
+    Test that previewing a scanned goal stays within its budget.
+    """
+    url = "/verification/verify"
+    res, calls = get_calls(client, url, {"data": get_goal_code(client, 0)})
+    assert res.get_json() == {"goal": "Goal 0"}
+    assert len(calls) <= ROUTE_BUDGETS[url], calls
+
+
+def test_finish_goal_within_budget(client):
+    """
+    Test that scanning a goal stays within its budget, and that scanning it
+    again only reports it was already completed. The first scan starts the
+    customer's progress, so only the unique progress index stops the second
+    from starting it again.
+    """
+    url = "/verification/finish-goal"
+    client.seed["db"]["progress"].delete_many({})
+    messages = []
+    for _ in range(2):
+        res, calls = get_calls(client, url, {"code": get_goal_code(client, 0)})
+        assert len(calls) <= ROUTE_BUDGETS[url], calls
+        messages.append(res.get_json()["message"])
+    assert messages == [
+        "Successfully marked as completed!",
+        "This goal has already been completed!"
+    ]
+    assert client.seed["db"]["progress"].count_documents({}) == 1
+
+
+def test_finish_goal_bingo_within_budget(client):
+    """
+    Test that a scan completing a bingo only adds the reward it issues to the
+    budget.
+    """
+    url = "/verification/finish-goal"
+    for position in (0, 1):
+        get_calls(client, url, {"code": get_goal_code(client, position)})
+    res, calls = get_calls(client, url, {"code": get_goal_code(client, 2)})
+    assert res.get_json()["message"] == "Successfully marked as completed!"
+    assert ("insert", "redemptions") in [call[:2] for call in calls]
+    assert len(calls) <= ROUTE_BUDGETS[url] + 1, calls
+
+
+def test_finish_reward_within_budget(client):
+    """
+    Test that redeeming a reward stays within its budget, and that redeeming
+    it again is refused.
+    """
+    url = "/verification/finish-reward"
+    messages = []
+    for _ in range(2):
+        res, calls = get_calls(client, url,
+                               {"code": client.seed["redemption_code"]})
+        assert len(calls) <= ROUTE_BUDGETS[url], calls
+        messages.append(res.get_json()["message"])
+    assert messages == [
+        "Successfully marked as redeemed!", "Code has already been redeemed!"
+    ]
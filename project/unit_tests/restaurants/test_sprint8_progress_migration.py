@@ -0,0 +1,95 @@
+"""
+This file houses the unit test suite for moving customers' progress into the
+progress collection.
+"""
+
+import os
+import sys
+import mongomock
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from bson.objectid import ObjectId
+from modules.database import Database
+from modules.indexes import IndexManager
+from modules.migrations import migrate_progress, migrate_redemptions
+
+
+def test_migrate_progress_twice():
+    """
+    Test that customers' progress is moved into the progress collection once,
+    merged into progress made since the deploy, and that the progress arrays
+    are only removed once their rewards have been moved too.
+    """
+    previous = Database.instance
+    try:
+        db = mongomock.MongoClient().bytes
+        database = Database.configure(db)
+        IndexManager(database).ensure_indexes()
+        first, second = ObjectId(), ObjectId()
+        db["customers"].insert_many([{
+            "username": "tester",
+            "progress": [{
+                "restaurant_id": first,
+                "completed_goals": [{
+                    "position": "0"
+                }]
+            }, {
+                "restaurant_id": second,
+                "completed_goals": [{
+                    "position": "4"
+                }],
+                "completed_rewards": [{
+                    "redemption_code": "14991fd515dbd032152e59d9db6bd4b5",
+                    "text": "$3 Off Any Entree",
+                    "is_redeemed": False
+                }]
+            }]
+        }, {
+            "username": "newcomer"
+        }])
+        # progress made since the deploy, before boards had epochs
+        db["progress"].insert_one({
+            "customer": "tester",
+            "restaurant_id": first,
+            "completed_goals": [{
+                "position": "1"
+            }]
+        })
+
+        assert migrate_progress(database, batch_size=1) == 1
+        assert migrate_progress(database, batch_size=1) == 0
+        progress = {
+            document["restaurant_id"]: document
+            for document in db["progress"].find({}, {"_id": 0})
+        }
+        assert progress == {
+            first: {
+                "customer": "tester",
+                "restaurant_id": first,
+                "epoch": 0,
+                "completed_goals": [{
+                    "position": "1"
+                }, {
+                    "position": "0"
+                }]
+            },
+            second: {
+                "customer": "tester",
+                "restaurant_id": second,
+                "epoch": 0,
+                "completed_goals": [{
+                    "position": "4"
+                }]
+            }
+        }
+        # the rewards have not been moved yet
+        assert "progress" in db["customers"].find_one({"username": "tester"})
+
+        migrate_redemptions(database)
+        assert migrate_progress(database) == 0
+        assert db["progress"].count_documents({}) == 2
+        assert db["customers"].count_documents({"progress": {
+            "$exists": True
+        }}) == 0
+    finally:
+        Database.instance = previous
@@ -0,0 +1,129 @@
+"""
+This file houses the unit test suite for moving rewards into the redemptions
+collection.
+"""
+
+import os
+import sys
+from datetime import datetime
+import mongomock
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from bson.objectid import ObjectId
+from modules.database import Database
+from modules.indexes import INDEXES, IndexManager
+from modules.migrations import get_redemption, migrate_redemptions
+
+
+def test_redemption_codes_are_unique():
+    """
+    Test that the redemptions collection declares a unique code index.
+    """
+    assert ("redemptions", [("redemption_code", 1)], {
+        "unique": True
+    }) in INDEXES
+
+
+def test_get_redemption_from_code():
+    """
+    Test that a reward's customer, reward and issue date are read from its code.
+    """
+    restaurant_id = ObjectId("5f15c084143cb39bfc5619b8")
+    code = "tester+5ef5009bccd1e88ead4cd076+1+2020-07-28 10:00:00.000001"
+    redemption = get_redemption(code, restaurant_id, {
+        "redemption_code": code,
+        "text": "One Free Drink Refill",
+        "is_redeemed": False
+    })
+    assert redemption == {
+        "redemption_code": code,
+        "restaurant_id": restaurant_id,
+        "customer": "tester",
+        "reward_id": ObjectId("5ef5009bccd1e88ead4cd076"),
+        "text": "One Free Drink Refill",
+        "is_redeemed": False,
+        "issue_date": datetime(2020, 7, 28, 10, 0, 0, 1)
+    }
+
+
+def test_get_redemption_keeps_redemption_date():
+    """
+    Test that a redeemed reward keeps its redemption date, even if its code
+    is not in the current format.
+    """
+    restaurant_id = ObjectId("5f15c084143cb39bfc5619b8")
+    redemption = get_redemption("14991fd515dbd032152e59d9db6bd4b5",
+                                restaurant_id, {
+                                    "text": "$3 Off Any Entree",
+                                    "is_redeemed": True,
+                                    "redemption_date": datetime(2020, 7, 28)
+                                })
+    assert redemption["is_redeemed"]
+    assert redemption["redemption_date"] == datetime(2020, 7, 28)
+    assert "issue_date" not in redemption
+
+
+def test_migrate_redemptions_twice():
+    """
+    Test that rewards kept with owners and customers are moved into the
+    redemptions collection once, keeping customers' goals, and that running
+    the migration again adds nothing.
+    """
+    previous = Database.instance
+    try:
+        db = mongomock.MongoClient().bytes
+        database = Database.configure(db)
+        IndexManager(database).ensure_indexes()
+        restaurant_id = ObjectId()
+        shared = "tester+5ef5009bccd1e88ead4cd076+0+2020-07-28 10:00:00"
+        owner_only = "14991fd515dbd032152e59d9db6bd4b5"
+        db["restaurant_users"].insert_one({
+            "_id": restaurant_id,
+            "username": "owner",
+            "client_rewards": [{
+                "redemption_code": shared,
+                "text": "One Free Drink Refill",
+                "is_redeemed": False
+            }, {
+                "redemption_code": owner_only,
+                "text": "$3 Off Any Entree",
+                "is_redeemed": True,
+                "redemption_date": datetime(2020, 7, 28)
+            }]
+        })
+        db["customers"].insert_one({
+            "username": "tester",
+            "progress": [{
+                "restaurant_id": restaurant_id,
+                "completed_goals": [{
+                    "position": "4"
+                }],
+                "completed_rewards": [{
+                    "redemption_code": shared,
+                    "text": "One Free Drink Refill",
+                    "is_redeemed": False
+                }]
+            }, {
+                "restaurant_id": ObjectId(),
+                "completed_goals": []
+            }]
+        })
+
+        assert migrate_redemptions(database, batch_size=1) == 2
+        assert migrate_redemptions(database, batch_size=1) == 0
+        redemptions = {
+            redemption["redemption_code"]: redemption
+            for redemption in db["redemptions"].find()
+        }
+        assert sorted(redemptions) == sorted([shared, owner_only])
+        assert redemptions[shared]["customer"] == "tester"
+        assert redemptions[shared]["restaurant_id"] == restaurant_id
+        assert redemptions[owner_only]["is_redeemed"]
+        assert "client_rewards" not in db["restaurant_users"].find_one()
+        progress = db["customers"].find_one()["progress"]
+        assert [list(entry) for entry in progress] == [[
+            "restaurant_id", "completed_goals"
+        ], ["restaurant_id", "completed_goals"]]
+        assert progress[0]["completed_goals"] == [{"position": "4"}]
+    finally:
+        Database.instance = previous
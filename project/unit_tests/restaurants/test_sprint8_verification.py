@@ -0,0 +1,145 @@
+"""
+This file houses the unit test suite for completing goals and redeeming
+rewards against the seeded local database (see conftest.py).
+"""
+
+import os
+import sys
+from datetime import datetime
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from pymongo.errors import DuplicateKeyError
+from restaurants_app import app
+from modules.owner.restaurant_profile_manager import RestaurantProfileManager
+from modules.owner.verification import Validator
+
+
+def test_goal_completed_once(seeded_db):
+    """
+    Test that scanning a goal twice completes it once, even when the first
+    scan starts the customer's progress.
+    """
+    seeded_db["db"]["progress"].delete_many({})
+    goal_id = str(seeded_db["goals"][0]["_id"])
+    messages = []
+    for _ in range(2):
+        with app.app_context():
+            validator = Validator(RestaurantProfileManager("owner"))
+            messages.append(validator.complete_goal("customer", goal_id, "0"))
+    assert messages == [
+        "Successfully marked as completed!",
+        "This goal has already been completed!"
+    ]
+    progress = list(seeded_db["db"]["progress"].find())
+    assert len(progress) == 1
+    assert [goal["position"] for goal in progress[0]["completed_goals"]
+           ] == ["0"]
+
+
+def test_goal_completed_when_progress_started_concurrently(
+        seeded_db, monkeypatch):
+    """
+    Test that a goal is still completed when another scan at the same
+    restaurant starts the customer's progress first, so that inserting the
+    progress document duplicates its unique index key.
+    """
+    goals = seeded_db["goals"]
+    progress = seeded_db["db"]["progress"]
+    progress.delete_many({})
+    find_one_and_update = progress.find_one_and_update
+    upserts = []
+
+    def race(query, document, *args, **kwargs):
+        """
+        Insert the other scan's progress before the first upsert lands.
+        """
+        if kwargs.get("upsert"):
+            upserts.append(query)
+            if len(upserts) == 1:
+                progress.insert_one({
+                    "customer": "customer",
+                    "restaurant_id": seeded_db["owner_id"],
+                    "epoch": 0,
+                    "completed_goals": [{
+                        "_id": goals[1]["_id"],
+                        "position": "1",
+                        "epoch": 0,
+                        "date_completed": datetime.now()
+                    }]
+                })
+                raise DuplicateKeyError("E11000 duplicate key error")
+        return find_one_and_update(query, document, *args, **kwargs)
+
+    monkeypatch.setattr(progress, "find_one_and_update", race)
+    with app.app_context():
+        validator = Validator(RestaurantProfileManager("owner"))
+        message = validator.complete_goal("customer", str(goals[0]["_id"]),
+                                          "0")
+    assert message == "Successfully marked as completed!"
+    assert len(upserts) == 1
+    documents = list(progress.find())
+    assert len(documents) == 1
+    assert [goal["position"] for goal in documents[0]["completed_goals"]
+           ] == ["1", "0"]
+
+
+def test_goal_added_to_existing_progress(seeded_db):
+    """
+    Test that a goal is added to the customer's existing progress once, and
+    that the goals already completed there are refused.
+    """
+    goals = seeded_db["goals"]
+    with app.app_context():
+        validator = Validator(RestaurantProfileManager("owner"))
+        messages = [
+            validator.complete_goal("customer", str(goals[position]["_id"]),
+                                    str(position)) for position in (0, 0, 4)
+        ]
+    assert messages == [
+        "Successfully marked as completed!",
+        "This goal has already been completed!",
+        "This goal has already been completed!"
+    ]
+    progress = seeded_db["db"]["progress"].find_one()
+    assert [goal["position"] for goal in progress["completed_goals"]
+           ] == ["4", "0"]
+
+
+def test_goal_code_must_match_board(seeded_db):
+    """
+    Test that a goal is refused at a position where it is not on the board,
+    or for a customer who does not exist.
+    """
+    goal_id = str(seeded_db["goals"][0]["_id"])
+    with app.app_context():
+        validator = Validator(RestaurantProfileManager("owner"))
+        messages = [
+            validator.complete_goal("customer", goal_id, "1"),
+            validator.complete_goal("customer", goal_id, "9"),
+            validator.complete_goal("nobody", goal_id, "0")
+        ]
+    assert messages == ["Invalid QR code!"] * 3
+    assert seeded_db["db"]["progress"].count_documents({}) == 1
+
+
+def test_reward_redeemed_once(seeded_db):
+    """
+    Test that a reward is redeemed once, and that a code this restaurant did
+    not issue is refused.
+    """
+    code = seeded_db["redemption_code"]
+    with app.app_context():
+        validator = Validator(RestaurantProfileManager("owner"))
+        messages = [
+            validator.complete_reward("customer", code),
+            validator.complete_reward("customer", code),
+            validator.complete_reward("customer", code + "0"),
+            validator.complete_reward("nobody", code)
+        ]
+    assert messages == [
+        "Successfully marked as redeemed!", "Code has already been redeemed!",
+        "Invalid QR code!", "Invalid QR code!"
+    ]
+    redemption = seeded_db["db"]["redemptions"].find_one()
+    assert redemption["is_redeemed"]
+    assert "redemption_date" in redemption
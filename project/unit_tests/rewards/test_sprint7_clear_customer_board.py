@@ -51,12 +51,10 @@ def test_reset_board(db):
     rest_id = rpm.get_restaurant_id()
     reset_complete_board(cpm, rest_id)
     
-    rest_board = db.query("customers", {
-        "username": "tester2",
-        "progress.restaurant_id": rest_id
+    user_board = db.query("progress", {
+        "customer": "tester2",
+        "restaurant_id": rest_id
         })
-        
-    user_board = [x for x in rest_board[0]['progress'] if x['restaurant_id'] == rest_id]
     
     assert len(user_board[0]["completed_goals"]) == 0
     
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+This file houses the unit test suite for the bingo line engine shared by the
+customer board and goal verification.
+"""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from modules import bingo
+from modules.customer.customer_board import check_bingo
+
+
+def test_lines_follow_reward_order():
+    """
+    Test that lines are ordered ascending diagonal, rows, columns, then
+    descending diagonal, matching a board's rewards.
+    """
+    assert bingo.get_lines(3) == ((2, 4, 6), (0, 1, 2), (3, 4, 5), (6, 7, 8),
+                                  (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8))
+    for size in range(3, 11):
+        assert len(bingo.get_lines(size)) == 2 * size + 2
+
+
+def test_completed_lines():
+    """
+    Test that only lines whose cells are all complete are returned.
+    """
+    mask = bingo.get_cells_mask(["0", "1", "2", "4", "8"])
+    assert bingo.get_completed_lines(mask, 3) == [1, 7]
+
+
+def test_new_lines_pass_through_position():
+    """
+    Test that only completed lines through the new cell are returned, so
+    earlier bingos are not rewarded twice.
+    """
+    mask = bingo.get_cells_mask([0, 1, 2, 3, 6, 9, 12, 15])
+    assert bingo.get_new_lines(mask, 15, 4) == []
+    assert bingo.get_new_lines(mask, 12, 4) == [0]
+
+
+def test_check_bingo_marks_board():
+    """
+    Test that check_bingo marks the cells and rewards of every bingo.
+    """
+    board = {
+        "board": [{} for _ in range(9)],
+        "board_reward": [{} for _ in range(8)]
+    }
+    check_bingo(board, list(range(9)), 3)
+    assert board["board"][0]["board_complete"]
+    assert all(cell["is_bingo"] for cell in board["board"])
+    assert all(reward["is_earned"] for reward in board["board_reward"])
@@ -0,0 +1,132 @@
+"""
+This file houses the unit test suite for building customers' board views and
+reward histories against the seeded local database (see conftest.py).
+"""
+
+import os
+import sys
+from datetime import datetime
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from bson.objectid import ObjectId
+from rewards_app import app
+from modules.instrumentation import record_calls
+from modules.customer.customer_profile_manager import CustomerProfileManager
+from modules.customer.customer_board import (get_board_view,
+                                             get_reward_progress)
+from modules.owner.restaurant_profile_manager import RESTAURANT_NAME_CACHE
+
+
+def get_view(owner_id):
+    """
+    Return the seeded customer's view of the given restaurant's board, and the
+    database calls made to build it.
+    """
+    with app.app_context(), record_calls() as calls:
+        board = get_board_view(CustomerProfileManager("customer"), owner_id)
+    return board, calls
+
+
+def test_board_view_from_two_queries(seeded_db):
+    """
+    Test that a board view is built from the board and the customer's
+    progress alone once the shared goals and rewards are cached.
+    """
+    owner_id = str(seeded_db["owner_id"])
+    get_view(owner_id)
+    board, calls = get_view(owner_id)
+    assert [call[:2] for call in calls] == [("find", "restaurant_users"),
+                                           ("find", "progress")]
+    assert [goal["goal"] for goal in board["board"]
+           ] == [goal["goal"] for goal in seeded_db["goals"]]
+    assert [goal["is_complete"] for goal in board["board"]
+           ] == [position == 4 for position in range(9)]
+    assert not any(goal["is_bingo"] for goal in board["board"])
+    assert not any(reward["is_earned"] for reward in board["board_reward"])
+
+
+def test_board_view_marks_bingos(seeded_db):
+    """
+    Test that the goals of a completed line are marked as a bingo and its
+    reward as earned.
+    """
+    goals = seeded_db["goals"]
+    seeded_db["db"]["progress"].update_one({}, {
+        "$push": {
+            "completed_goals": {
+                "$each": [{
+                    "_id": goals[position]["_id"],
+                    "position": str(position),
+                    "epoch": 0
+                } for position in (3, 5)]
+            }
+        }
+    })
+    board, _ = get_view(str(seeded_db["owner_id"]))
+    assert [goal["is_bingo"] for goal in board["board"]
+           ] == [position in (3, 4, 5) for position in range(9)]
+    # the middle row is the third line, after the ascending diagonal
+    assert [reward["is_earned"] for reward in board["board_reward"]
+           ] == [line == 2 for line in range(8)]
+
+
+def test_board_view_ignores_other_epochs(seeded_db):
+    """
+    Test that progress made on a previous board is not shown.
+    """
+    seeded_db["db"]["restaurant_users"].update_one(
+        {}, {"$set": {
+            "bingo_board.epoch": 1
+        }})
+    board, _ = get_view(str(seeded_db["owner_id"]))
+    assert not any(goal["is_complete"] for goal in board["board"])
+
+
+def test_board_view_without_restaurant(seeded_db):
+    """
+    Test that there is no board view for an unknown restaurant.
+    """
+    board, _ = get_view("5f15c084143cb39bfc5619b8")
+    assert board is None
+
+
+def test_reward_names_in_one_query(seeded_db):
+    """
+    Test that the restaurant names of a reward history are read in one query
+    however many restaurants issued them, then from the cache, and that
+    rewards from restaurants without a name are kept.
+    """
+    db = seeded_db["db"]
+    other_id = db["restaurant_users"].insert_one({
+        "username": "other",
+        "profile": {
+            "name": "Other"
+        }
+    }).inserted_id
+    for restaurant_id, code, redeemed in ((other_id, "a", True),
+                                          (other_id, "b", False),
+                                          (ObjectId(), "c", False)):
+        db["redemptions"].insert_one({
+            "redemption_code": code,
+            "restaurant_id": restaurant_id,
+            "customer": "customer",
+            "text": "Reward",
+            "is_redeemed": redeemed,
+            "redemption_date": datetime(2020, 7, 28)
+        })
+    RESTAURANT_NAME_CACHE.invalidate()
+
+    with app.app_context(), record_calls() as calls:
+        active, redeemed = get_reward_progress(
+            CustomerProfileManager("customer"))
+    assert [call[1] for call in calls] == ["redemptions", "restaurant_users"]
+    assert [reward["restaurant_name"] for reward in active
+           ] == ["Restaurant", "Other", ""]
+    assert [(reward["restaurant_name"], reward["redemption_date"])
+            for reward in redeemed] == [("Other", "July 28, 2020")]
+
+    # names are not cached for restaurants without one
+    db["redemptions"].delete_one({"redemption_code": "c"})
+    with app.app_context(), record_calls() as calls:
+        get_reward_progress(CustomerProfileManager("customer"))
+    assert [call[1] for call in calls] == ["redemptions"]
@@ -0,0 +1,64 @@
+"""
+This file houses the unit test suite holding the customer routes to a budget
+of database round trips. The app runs against the seeded local database (see
+conftest.py), and every database call made while serving a request is
+recorded. Budgets are for a logged in customer whose credentials and the
+shared goals and rewards are already cached, as they are on most requests.
+"""
+
+import os
+import sys
+import pytest
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from rewards_app import app
+from modules.instrumentation import record_calls
+
+# Largest number of database calls each route may make
+ROUTE_BUDGETS = {
+    "/restaurants/": 2,
+    "/restaurants/directory": 1,
+    "/restaurants/<id>/board": 2,
+    "/restaurants/<id>/profile": 1,
+    "/restaurants/<id>/reset-board": 2,
+    "/personal/favourites": 2,
+    "/personal/favourites/<id>/update": 1,
+    "/personal/favourites/<id>/favourite": 1,
+    "/personal/rewards": 1
+}
+
+
+@pytest.fixture
+def client(seeded_db):
+    """
+    Return a testing client logged in as the seeded customer, with the
+    seeded restaurant's id as its "owner_id".
+    """
+    app.config['TESTING'] = True
+    client = app.test_client()
+    client.post("/login", data={"username": "customer", "password": "password"})
+    client.owner_id = str(seeded_db["owner_id"])
+    # Caches the shared goals and rewards
+    client.get("/restaurants/" + client.owner_id + "/board")
+    return client
+
+
+def get_calls(client, url):
+    """
+    Return the database calls made while serving the given url.
+    """
+    with record_calls() as calls:
+        res = client.get(url)
+    assert res.status_code < 400
+    return calls
+
+
+@pytest.mark.parametrize("route", list(ROUTE_BUDGETS))
+def test_route_within_budget(client, route):
+    """
+    Test that serving a route stays within its budget once caches are warm.
+    """
+    url = route.replace("<id>", client.owner_id)
+    get_calls(client, url)
+    calls = get_calls(client, url)
+    assert len(calls) <= ROUTE_BUDGETS[route], calls
@@ -0,0 +1,137 @@
+"""
+This file houses the unit test suite for the paginated public restaurant
+directory against the seeded local database (see conftest.py).
+"""
+
+import os
+import sys
+import pytest
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from rewards_app import app
+from modules.migrations import migrate_directory_fields
+from modules.owner.restaurant_profile_manager import RestaurantProfileManager
+from modules.owner.public_profile import PublicProfileModifier
+
+
+@pytest.fixture
+def client(seeded_db):
+    """
+    Return a testing client logged in as the seeded customer, with five more
+    public restaurants next to the seeded one, and a private one. Their ids,
+    in directory order, are the client's "public_ids".
+    """
+    db = seeded_db["db"]
+    for i, (category, city) in enumerate([("Pizza", "Ottawa"),
+                                          ("Sushi", "Toronto"),
+                                          ("Sushi", "Ottawa"),
+                                          ("Pizza", "Toronto"),
+                                          ("Cafe", "Toronto"), ("Pizza", None)]):
+        db["restaurant_users"].insert_one({
+            "username": "owner" + str(i),
+            "profile": {
+                "name": "Restaurant " + str(i),
+                "category": category,
+                "location": {
+                    "city": city
+                },
+                "is_public": city is not None
+            }
+        })
+    app.config['TESTING'] = True
+    client = app.test_client()
+    client.post("/login", data={"username": "customer", "password": "password"})
+    client.public_ids = [
+        str(owner["_id"]) for owner in db["restaurant_users"].find(
+            {"profile.is_public": True}).sort("_id", 1)
+    ]
+    return client
+
+
+def get_page(client, **args):
+    """
+    Return the ids and next cursor of a directory page with the given query
+    arguments.
+    """
+    res = client.get("/restaurants/directory", query_string=args)
+    assert res.status_code == 200
+    page = res.get_json()
+    return [profile["_id"] for profile in page["restaurants"]], page["next"]
+
+
+def test_directory_pages_follow_cursor(client):
+    """
+    Test that each page continues from the previous page's cursor without
+    overlap, and that the last page has no next cursor.
+    """
+    with app.app_context():
+        modifier = PublicProfileModifier(RestaurantProfileManager(""))
+        ids = []
+        after = None
+        for _ in range(3):
+            profiles, after = modifier.get_directory_page(after=after,
+                                                          limit=2)
+            ids.append([str(rest_id) for rest_id in profiles])
+    assert ids == [
+        client.public_ids[0:2], client.public_ids[2:4], client.public_ids[4:6]
+    ]
+    assert after is None
+
+
+def test_directory_last_page(client):
+    """
+    Test that a page holding the last restaurant has no next cursor.
+    """
+    assert get_page(client) == (client.public_ids, None)
+    assert get_page(client,
+                    after=client.public_ids[3]) == (client.public_ids[4:], None)
+
+
+def test_directory_filters(client):
+    """
+    Test that the category and city filters narrow the directory, whatever
+    case they are typed in.
+    """
+    ids = client.public_ids
+    assert get_page(client, category="Pizza")[0] == [ids[0], ids[1], ids[4]]
+    assert get_page(client, category="sushi", city="ottawa")[0] == [ids[3]]
+    assert get_page(client, city="TORONTO")[0] == [ids[0], ids[2], ids[4],
+                                                   ids[5]]
+    assert get_page(client, category="Thai") == ([], None)
+
+
+def test_directory_malformed_cursor(client):
+    """
+    Test that a malformed cursor returns an empty page.
+    """
+    assert get_page(client, after="not-an-id") == ([], None)
+
+
+def test_directory_fields_normalized(client, seeded_db):
+    """
+    Test that a saved category and city are normalized, and that profiles
+    saved before are normalized by the migration.
+    """
+    db = seeded_db["db"]
+    with app.app_context():
+        PublicProfileModifier(RestaurantProfileManager("owner")).update_profile({
+            "name": "Restaurant",
+            "category": "wood  fired pizza",
+            "location": {
+                "city": "new york"
+            },
+            "is_public": "on"
+        })
+    profile = db["restaurant_users"].find_one({"username": "owner"})["profile"]
+    assert (profile["category"],
+            profile["location"]["city"]) == ("Wood Fired Pizza", "New York")
+
+    db["restaurant_users"].update_one(
+        {"username": "owner0"}, {"$set": {
+            "profile.location.city": "ottawa"
+        }})
+    assert migrate_directory_fields() == 1
+    assert migrate_directory_fields() == 0
+    assert get_page(client, city="Ottawa")[0] == client.public_ids[1:2] + [
+        client.public_ids[3]
+    ]
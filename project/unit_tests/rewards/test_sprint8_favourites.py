@@ -0,0 +1,56 @@
+"""
+This file houses the unit test suite for toggling favourite restaurants
+against the seeded local database (see conftest.py).
+"""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from bson.objectid import ObjectId
+from rewards_app import app
+from modules.customer.customer_profile_manager import CustomerProfileManager
+from modules.customer.favourite import update_favourite
+
+
+def test_favourite_toggled(seeded_db):
+    """
+    Test that toggling a favourite removes it if it is already there, and adds
+    it back at the end otherwise.
+    """
+    owner_id = seeded_db["owner_id"]
+    other_id = ObjectId()
+    with app.app_context():
+        cpm = CustomerProfileManager("customer")
+        assert update_favourite(cpm, str(other_id)) == [owner_id, other_id]
+        assert update_favourite(cpm, str(owner_id)) == [other_id]
+        assert update_favourite(cpm, str(owner_id)) == [other_id, owner_id]
+    customer = seeded_db["db"]["customers"].find_one()
+    assert customer["favourite"] == [other_id, owner_id]
+
+
+def test_first_favourite_added(seeded_db):
+    """
+    Test that a favourite is added for a customer who has none yet.
+    """
+    seeded_db["db"]["customers"].update_one({"username": "customer"},
+                                            {"$unset": {
+                                                "favourite": ""
+                                            }})
+    with app.app_context():
+        cpm = CustomerProfileManager("customer")
+        assert update_favourite(cpm, str(
+            seeded_db["owner_id"])) == [seeded_db["owner_id"]]
+
+
+def test_favourite_ignores_invalid_ids(seeded_db):
+    """
+    Test that an invalid restaurant id or an unknown customer changes nothing.
+    """
+    with app.app_context():
+        assert update_favourite(CustomerProfileManager("customer"),
+                                "invalid") is None
+        assert update_favourite(CustomerProfileManager("nobody"),
+                                str(seeded_db["owner_id"])) is None
+    customer = seeded_db["db"]["customers"].find_one()
+    assert customer["favourite"] == [seeded_db["owner_id"]]
@@ -0,0 +1,89 @@
+"""
+This file houses the unit test suite for the QR code image store.
+"""
+
+import os
+import sys
+import itertools
+sys.path.insert(1, os.path.join(os.path.dirname(__file__),
+                                '../../src'))  # Import the src folder
+from rewards_app import app
+from modules import qr_codes
+
+
+def test_qr_code_is_png(tmp_path, monkeypatch):
+    """
+    Test that a QR code is rendered as a PNG image.
+    """
+    monkeypatch.setattr(qr_codes, "QR_CACHE_DIR", str(tmp_path))
+    qr_codes.QR_CACHE.invalidate()
+    image = qr_codes.get_qr_code("tester+5ef5009bccd1e88ead4cd076+0", 8)
+    assert image.startswith(b"\x89PNG")
+
+
+def test_qr_code_is_stored_on_disk(tmp_path, monkeypatch):
+    """
+    Test that a rendered QR code is read back from disk once it is no longer
+    in memory.
+    """
+    monkeypatch.setattr(qr_codes, "QR_CACHE_DIR", str(tmp_path))
+    qr_codes.QR_CACHE.invalidate()
+    image = qr_codes.get_qr_code("tester+5ef5009bccd1e88ead4cd076+0", 8)
+    key = qr_codes.get_qr_key("tester+5ef5009bccd1e88ead4cd076+0", 8)
+    assert (tmp_path / (key + ".png")).read_bytes() == image
+
+    qr_codes.QR_CACHE.invalidate()
+    (tmp_path / (key + ".png")).write_bytes(b"stored")
+    assert qr_codes.get_qr_code("tester+5ef5009bccd1e88ead4cd076+0",
+                                8) == b"stored"
+
+
+def test_qr_key_depends_on_box_size():
+    """
+    Test that images of the same payload at different sizes are kept apart.
+    """
+    assert qr_codes.get_qr_key("code", 8) != qr_codes.get_qr_key("code", 24)
+
+
+def test_qr_files_are_pruned(tmp_path, monkeypatch):
+    """
+    Test that images on disk are only pruned every QR_PRUNE_INTERVAL writes,
+    and that the images least recently read or written are removed first.
+    """
+    monkeypatch.setattr(qr_codes, "QR_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(qr_codes, "QR_DISK_CACHE_SIZE", 2)
+    monkeypatch.setattr(qr_codes, "QR_PRUNE_INTERVAL", 4)
+    monkeypatch.setattr(qr_codes, "QR_WRITES", itertools.count(1))
+    for i, key in enumerate(["a", "b", "c"]):
+        qr_codes.write_qr_file(key, b"image")
+        os.utime(tmp_path / (key + ".png"), (i, i))
+    assert len(list(tmp_path.iterdir())) == 3
+    assert qr_codes.read_qr_file("a") == b"image"
+    qr_codes.write_qr_file("d", b"image")
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "a.png", "d.png"
+    ]
+
+
+def test_qr_route_revalidates_by_etag(seeded_db, tmp_path, monkeypatch):
+    """
+    Test that the QR code route serves an image with its ETag, and answers a
+    request holding that ETag with 304 and no image.
+    """
+    monkeypatch.setattr(qr_codes, "QR_CACHE_DIR", str(tmp_path))
+    qr_codes.QR_CACHE.invalidate()
+    app.config['TESTING'] = True
+    client = app.test_client()
+    client.post("/login", data={"username": "customer", "password": "password"})
+    url = "/qr/?data=tester%2B5ef5009bccd1e88ead4cd076%2B0&box_size=8"
+
+    res = client.get(url)
+    key = qr_codes.get_qr_key("tester+5ef5009bccd1e88ead4cd076+0", 8)
+    assert res.status_code == 200
+    assert res.mimetype == "image/png"
+    assert res.get_etag() == (key, False)
+
+    res = client.get(url, headers={"If-None-Match": '"' + key + '"'})
+    assert res.status_code == 304
+    assert res.data == b""
+    assert res.get_etag() == (key, False)